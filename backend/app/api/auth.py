@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 
 from app.models.user import UserCreate, UserResponse
 from app.services.auth_service import auth_service
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_current_user_full
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
@@ -50,18 +51,25 @@ async def login(login_data: LoginRequest):
     )
 
 @router.post("/refresh", response_model=dict)
-async def refresh_token(refresh_data: RefreshTokenRequest):
+async def refresh_token(refresh_data: RefreshTokenRequest, response: Response):
     """Refresh access token"""
     tokens = await auth_service.refresh_token(refresh_data.refresh_token)
+    response.headers["Cache-Control"] = "no-store"
     return tokens
 
 @router.post("/logout")
-async def logout(current_user: UserResponse = Depends(get_current_active_user)):
+async def logout(
+    refresh_data: Optional[RefreshTokenRequest] = None,
+    current_user: UserResponse = Depends(get_current_active_user)
+):
     """Logout user"""
-    await auth_service.logout_user(current_user.id)
+    await auth_service.logout_user(
+        current_user.id,
+        refresh_token=refresh_data.refresh_token if refresh_data else None
+    )
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: UserResponse = Depends(get_current_active_user)):
-    """Get current user information"""
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_user_full)):
+    """Get current user information (always fresh from the DB)"""
     return current_user
\ No newline at end of file
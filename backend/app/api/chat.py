@@ -1,11 +1,12 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+import asyncio
+from typing import List, Dict, Any, Iterable, Optional, Set
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
 from datetime import datetime
-import json
+import orjson
 
 from app.models.chat import (
     Conversation, ConversationCreate, ConversationResponse,
-    Message, MessageCreate, MessageResponse, ThinkingMode, ChatSession
+    Message, MessageCreate, MessageResponse, MessageRole, ThinkingMode, ChatSession
 )
 from app.models.user import UserResponse
 from app.services.ai_service import ai_service
@@ -14,21 +15,111 @@ from app.api.deps import get_current_active_user, rate_limit_check
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+class _Connection:
+    """Per-socket state: a bounded send queue drained by a writer task"""
+
+    __slots__ = ("websocket", "queue", "writer")
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self.writer: Optional[asyncio.Task] = None
+
 class ConnectionManager:
+    """Sharded WebSocket registry with room subscriptions.
+
+    Connections are spread over fixed shards guarded by per-shard locks so
+    connect/disconnect churn never contends on a single global dict, and
+    room broadcasts iterate only subscribed members. Every connection owns
+    a bounded send queue, so a slow client backs up its own queue instead
+    of the event loop or process memory.
+    """
+
+    SHARD_COUNT = 64  # power of two so shard index is a cheap mask
+
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-    
+        self.shards: List[Dict[str, _Connection]] = [{} for _ in range(self.SHARD_COUNT)]
+        self.locks: List[asyncio.Lock] = [asyncio.Lock() for _ in range(self.SHARD_COUNT)]
+        self.rooms: Dict[str, Set[str]] = {}
+
+    def _shard(self, user_id: str) -> int:
+        return hash(user_id) & (self.SHARD_COUNT - 1)
+
+    async def _drain(self, connection: _Connection):
+        """Writer task: pushes queued frames to one socket in order"""
+        try:
+            while True:
+                payload = await connection.queue.get()
+                await connection.websocket.send_bytes(payload)
+        except Exception:
+            # Socket is gone; the endpoint's disconnect path cleans up
+            pass
+
+    def _enqueue(self, connection: _Connection, payload: bytes, droppable: bool = False):
+        try:
+            connection.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            if droppable:
+                return  # typing indicators and the like can be shed
+            # Drop the oldest frame to make room for the new one
+            try:
+                connection.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            connection.queue.put_nowait(payload)
+
     async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-    
-    def disconnect(self, user_id: str):
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-    
+        connection = _Connection(websocket)
+        connection.writer = asyncio.create_task(self._drain(connection))
+        shard = self._shard(user_id)
+        async with self.locks[shard]:
+            self.shards[shard][user_id] = connection
+
+    async def disconnect(self, user_id: str):
+        shard = self._shard(user_id)
+        async with self.locks[shard]:
+            connection = self.shards[shard].pop(user_id, None)
+        if connection and connection.writer:
+            connection.writer.cancel()
+        for members in self.rooms.values():
+            members.discard(user_id)
+
+    def join_room(self, room_id: str, user_id: str):
+        self.rooms.setdefault(room_id, set()).add(user_id)
+
+    def leave_room(self, room_id: str, user_id: str):
+        members = self.rooms.get(room_id)
+        if members:
+            members.discard(user_id)
+            if not members:
+                del self.rooms[room_id]
+
+    def get(self, user_id: str) -> Optional[_Connection]:
+        return self.shards[self._shard(user_id)].get(user_id)
+
     async def send_message(self, user_id: str, message: dict):
-        if user_id in self.active_connections:
-            await self.active_connections[user_id].send_text(json.dumps(message))
+        connection = self.get(user_id)
+        if connection:
+            self._enqueue(
+                connection,
+                orjson.dumps(message),
+                droppable=message.get("type") == "typing"
+            )
+
+    async def broadcast(self, user_ids: Iterable[str], message: dict):
+        """Send one message to many sockets, serializing the frame once"""
+        payload = orjson.dumps(message)
+        droppable = message.get("type") == "typing"
+        for user_id in user_ids:
+            connection = self.get(user_id)
+            if connection:
+                self._enqueue(connection, payload, droppable=droppable)
+
+    async def broadcast_room(self, room_id: str, message: dict):
+        members = self.rooms.get(room_id)
+        if members:
+            await self.broadcast(tuple(members), message)
 
 manager = ConnectionManager()
 
@@ -53,20 +144,36 @@ async def create_conversation(
     
     return ConversationResponse(**conversation.dict())
 
-@router.get("/conversations", response_model=List[ConversationResponse])
+@router.get(
+    "/conversations",
+    response_model=List[ConversationResponse],
+    response_model_exclude_none=True
+)
 async def get_conversations(
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """Get user's conversations"""
     db = get_database()
     
+    # Project only the fields ConversationResponse needs to cut BSON
+    # decode and Pydantic construction work
     conversations = await db.conversations.find(
-        {"user_id": current_user.id, "is_active": True}
+        {"user_id": current_user.id, "is_active": True},
+        {
+            "_id": 0, "id": 1, "title": 1, "chat_type": 1,
+            "thinking_mode": 1, "ai_model": 1, "active_integrations": 1,
+            "is_active": 1, "last_activity": 1, "created_at": 1
+        }
     ).sort("last_activity", -1).limit(50).to_list(50)
-    
-    return [ConversationResponse(**conv) for conv in conversations]
 
-@router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
+    # DB-sourced data is already shaped by the projection; skip validation
+    return [ConversationResponse.model_construct(**conv) for conv in conversations]
+
+@router.get(
+    "/conversations/{conversation_id}/messages",
+    response_model=List[MessageResponse],
+    response_model_exclude_none=True
+)
 async def get_messages(
     conversation_id: str,
     current_user: UserResponse = Depends(get_current_active_user),
@@ -74,62 +181,99 @@ async def get_messages(
 ):
     """Get conversation messages"""
     db = get_database()
-    
-    # Verify conversation belongs to user
-    conversation = await db.conversations.find_one({
-        "id": conversation_id,
-        "user_id": current_user.id
-    })
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-    
+
+    # Messages carry a denormalized user_id, so ownership and retrieval
+    # are a single indexed query instead of two round trips
     messages = await db.messages.find(
-        {"conversation_id": conversation_id}
+        {"conversation_id": conversation_id, "user_id": current_user.id}
     ).sort("created_at", 1).limit(limit).to_list(limit)
-    
-    return [MessageResponse(**msg) for msg in messages]
 
-@router.post("/conversations/{conversation_id}/messages", response_model=MessageResponse)
+    if not messages:
+        # Only distinguish an empty conversation from a missing one when
+        # the fast path comes back empty
+        owned = await db.conversations.count_documents(
+            {"id": conversation_id, "user_id": current_user.id},
+            limit=1
+        )
+        if not owned:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+
+    return [MessageResponse.model_construct(**{k: msg.get(k) for k in MessageResponse.model_fields}) for msg in messages]
+
+@router.post(
+    "/conversations/{conversation_id}/messages",
+    response_model=MessageResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def send_message(
     conversation_id: str,
     message_data: MessageCreate,
+    background_tasks: BackgroundTasks,
     current_user: UserResponse = Depends(get_current_active_user),
     _: None = Depends(rate_limit_check)
 ):
-    """Send message to conversation"""
+    """Send message to conversation; the AI reply streams over WebSocket"""
     db = get_database()
-    
-    # Verify conversation belongs to user
-    conversation = await db.conversations.find_one({
-        "id": conversation_id,
-        "user_id": current_user.id
-    })
-    if not conversation:
+
+    # Verify ownership and bump activity in a single write
+    result = await db.conversations.update_one(
+        {"id": conversation_id, "user_id": current_user.id},
+        {"$set": {"last_activity": datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    
-    # Process message with AI
+
+    # Persist the user message immediately; the LLM call runs off the
+    # request path so the client never pays model latency on the POST
+    user_message = Message(
+        conversation_id=conversation_id,
+        user_id=current_user.id,
+        role=MessageRole.USER,
+        content=message_data.content,
+        metadata={"status": "pending"}
+    )
+    await db.messages.insert_one(user_message.dict())
+
+    background_tasks.add_task(
+        _process_ai_response,
+        current_user.id,
+        conversation_id,
+        message_data.content,
+        message_data.thinking_mode or ThinkingMode.MEDIUM,
+        user_message.id
+    )
+
+    return MessageResponse(**user_message.dict())
+
+async def _process_ai_response(
+    user_id: str,
+    conversation_id: str,
+    message_content: str,
+    thinking_mode: ThinkingMode,
+    user_message_id: str
+):
+    """Run the AI call in the background and push the result over WebSocket"""
     try:
         ai_response = await ai_service.process_message(
-            user_id=current_user.id,
+            user_id=user_id,
             conversation_id=conversation_id,
-            message_content=message_data.content,
-            thinking_mode=message_data.thinking_mode or ThinkingMode.MEDIUM
+            message_content=message_content,
+            thinking_mode=thinking_mode,
+            user_message_id=user_message_id
         )
-        
-        # Send real-time update via WebSocket
-        await manager.send_message(current_user.id, {
+
+        await manager.send_message(user_id, {
             "type": "ai_response",
             "conversation_id": conversation_id,
             "message": ai_response
         })
-        
-        return MessageResponse(**ai_response)
-    
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"AI processing failed: {str(e)}"
-        )
+        await manager.send_message(user_id, {
+            "type": "ai_error",
+            "conversation_id": conversation_id,
+            "user_message_id": user_message_id,
+            "error": str(e)
+        })
 
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
@@ -147,25 +291,49 @@ async def delete_conversation(
     
     return {"message": "Conversation deleted"}
 
+# Inbound frame batching: drain up to this many frames per loop turn,
+# waiting briefly for stragglers so bursts are handled together
+_WS_BATCH_MAX = 32
+_WS_COALESCE_SECONDS = 0.005
+_PONG_FRAME = orjson.dumps({"type": "pong"})
+
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
     """WebSocket endpoint for real-time chat"""
     try:
         await manager.connect(websocket, user_id)
-        
+
         while True:
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
-            
-            # Handle different message types
-            if message_data.get("type") == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
-            elif message_data.get("type") == "typing":
-                # Broadcast typing indicator to other participants
+            # Block for the first frame, then coalesce any burst behind it
+            frames = [await websocket.receive_text()]
+            while len(frames) < _WS_BATCH_MAX:
+                try:
+                    frames.append(await asyncio.wait_for(
+                        websocket.receive_text(),
+                        timeout=_WS_COALESCE_SECONDS
+                    ))
+                except asyncio.TimeoutError:
+                    break
+
+            ping_seen = False
+            typing_seen = False
+            for data in frames:
+                message_type = orjson.loads(data).get("type")
+                if message_type == "ping":
+                    ping_seen = True
+                elif message_type == "typing":
+                    typing_seen = True
+
+            # One reply per batch, however many frames arrived
+            if ping_seen:
+                await websocket.send_bytes(_PONG_FRAME)
+            if typing_seen:
+                # Broadcast a single coalesced typing indicator to other
+                # participants
                 pass
-            
+
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
+        await manager.disconnect(user_id)
     except Exception as e:
         print(f"WebSocket error: {e}")
-        manager.disconnect(user_id)
\ No newline at end of file
+        await manager.disconnect(user_id)
\ No newline at end of file
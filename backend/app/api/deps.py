@@ -1,19 +1,87 @@
+import asyncio
+import hashlib
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status, Header
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.models.user import UserResponse
+from app.models.user import UserResponse, UserRole
 from app.services.auth_service import auth_service
-from app.db.redis import check_rate_limit
-from app.core.config import settings
+from app.db.redis import check_rate_limit_buckets
+from app.core.config import settings, RL_MIN, RL_HOUR
+from app.core.security import verify_token
 
 # Security scheme
 security = HTTPBearer()
 
+# Short-lived token verification cache: repeated requests with the same bearer
+# token skip JWT signature verification and the user lookup on cache hits
+_token_cache: TTLCache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+_token_cache_lock = asyncio.Lock()
+
+def _user_from_claims(payload: dict) -> Optional[UserResponse]:
+    """Build an authorization principal from access-token claims.
+
+    Tokens issued since claims were embedded carry everything the
+    permission checks need; profile fields are left empty. Routes that
+    need fresh DB state should depend on get_current_user_full.
+    """
+    if "is_active" not in payload:
+        return None  # older token without embedded claims
+
+    return UserResponse.model_construct(
+        id=payload["sub"],
+        email=payload.get("email", ""),
+        full_name=None,
+        avatar_url=None,
+        is_active=bool(payload["is_active"]),
+        is_verified=False,
+        team_id=payload.get("team_id"),
+        role=payload.get("role", UserRole.MEMBER),
+        settings={},
+        created_at=None,
+        last_login=None
+    )
+
+async def resolve_bearer_token(token: str) -> UserResponse:
+    """Resolve a bearer token to a user, via the shared TTL cache"""
+    # Key on a token digest so raw bearer tokens never sit in memory
+    cache_key = hashlib.sha256(token.encode()).digest()[:16]
+
+    async with _token_cache_lock:
+        cached_user = _token_cache.get(cache_key)
+    if cached_user is not None:
+        return cached_user
+
+    # Tokens with embedded claims resolve without touching the DB
+    payload = verify_token(token, "access")
+    user = _user_from_claims(payload)
+    if user is None:
+        user = await auth_service.get_current_user(token)
+
+    async with _token_cache_lock:
+        _token_cache[cache_key] = user
+
+    return user
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> UserResponse:
     """Get current authenticated user"""
+    # The auth middleware usually resolved the user already
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    return await resolve_bearer_token(credentials.credentials)
+
+async def get_current_user_full(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UserResponse:
+    """Get current authenticated user with fresh DB state"""
     return await auth_service.get_current_user(credentials.credentials)
 
 async def get_current_active_user(
@@ -28,34 +96,33 @@ async def get_current_active_user(
     return current_user
 
 async def rate_limit_check(
+    request: Request,
     x_forwarded_for: Optional[str] = Header(None),
-    current_user: UserResponse = Depends(get_current_active_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Rate limiting middleware"""
-    # Use user ID as rate limit key
+    # Already charged by AuthRateLimitMiddleware for this request
+    if getattr(request.state, "rate_limited", False):
+        return
+
+    # Use user ID as rate limit key; both windows are checked in one
+    # atomic Redis call (see check_rate_limit_buckets)
     rate_limit_key = f"rate_limit:user:{current_user.id}"
-    
-    # Check per-minute rate limit
-    minute_check = await check_rate_limit(
+
+    check = await check_rate_limit_buckets(
         f"{rate_limit_key}:minute",
-        settings.RATE_LIMIT_PER_MINUTE,
-        60
+        f"{rate_limit_key}:hour",
+        RL_MIN,
+        RL_HOUR
     )
-    
-    if not minute_check["allowed"]:
+
+    if not check["minute_allowed"]:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded - too many requests per minute"
         )
-    
-    # Check per-hour rate limit
-    hour_check = await check_rate_limit(
-        f"{rate_limit_key}:hour",
-        settings.RATE_LIMIT_PER_HOUR,
-        3600
-    )
-    
-    if not hour_check["allowed"]:
+
+    if not check["hour_allowed"]:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded - too many requests per hour"
@@ -1,10 +1,12 @@
+import hashlib
 from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from fastapi.responses import RedirectResponse
 
 from app.models.integration import (
-    Integration, IntegrationCreate, IntegrationResponse, 
-    IntegrationType, IntegrationStatus
+    Integration, IntegrationCreate, IntegrationResponse,
+    IntegrationType, IntegrationStatus, INTEGRATION_CONFIGS
 )
 from app.models.user import UserResponse
 from app.services.integration_service import integration_service
@@ -12,15 +14,16 @@ from app.api.deps import get_current_active_user, rate_limit_check
 
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
-@router.get("/", response_model=List[IntegrationResponse])
+@router.get("/", response_model=List[IntegrationResponse], response_model_exclude_none=True)
 async def get_integrations(
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """Get user's integrations"""
     integrations = await integration_service.get_user_integrations(current_user.id)
-    
+
+    # Trusted DB-sourced data; model_construct skips re-validation
     return [
-        IntegrationResponse(
+        IntegrationResponse.model_construct(
             id=integration["id"],
             integration_type=integration["integration_type"],
             name=integration["name"],
@@ -35,20 +38,27 @@ async def get_integrations(
         for integration in integrations
     ]
 
+# The available-integrations list is pure config data; serialize it once
+# at import and serve the frozen bytes
+_AVAILABLE_INTEGRATIONS_JSON = orjson.dumps([
+    {
+        "type": integration_type.value,
+        "name": config["name"],
+        "capabilities": config["capabilities"],
+        "webhook_events": config["webhook_events"]
+    }
+    for integration_type, config in INTEGRATION_CONFIGS.items()
+])
+_AVAILABLE_INTEGRATIONS_ETAG = f'"{hashlib.sha256(_AVAILABLE_INTEGRATIONS_JSON).hexdigest()[:16]}"'
+
 @router.get("/available")
 async def get_available_integrations():
     """Get list of available integrations"""
-    from app.models.integration import INTEGRATION_CONFIGS
-    
-    return [
-        {
-            "type": integration_type.value,
-            "name": config["name"],
-            "capabilities": config["capabilities"],
-            "webhook_events": config["webhook_events"]
-        }
-        for integration_type, config in INTEGRATION_CONFIGS.items()
-    ]
+    return Response(
+        content=_AVAILABLE_INTEGRATIONS_JSON,
+        media_type="application/json",
+        headers={"ETag": _AVAILABLE_INTEGRATIONS_ETAG}
+    )
 
 @router.post("/connect/{integration_type}")
 async def connect_integration(
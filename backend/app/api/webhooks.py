@@ -1,12 +1,29 @@
+import asyncio
+import hashlib
+import hmac
+import time
+from datetime import datetime
 from typing import Dict, Any
 from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
-import json
+import orjson
 
+from app.core.config import settings
 from app.db.mongodb import get_database
 from app.services.workflow_service import workflow_service
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
+# Second-granularity cached ISO timestamp: webhook bookkeeping doesn't need
+# microseconds, and this skips a datetime format per event
+_now_cache = {"second": 0, "iso": ""}
+
+def _utcnow_iso() -> str:
+    second = int(time.time())
+    if _now_cache["second"] != second:
+        _now_cache["second"] = second
+        _now_cache["iso"] = datetime.utcnow().isoformat()
+    return _now_cache["iso"]
+
 @router.post("/n8n/{workflow_id}")
 async def n8n_webhook(
     workflow_id: str,
@@ -17,7 +34,7 @@ async def n8n_webhook(
     try:
         # Get request body
         body = await request.body()
-        trigger_data = json.loads(body) if body else {}
+        trigger_data = orjson.loads(body) if body else {}
         
         # Add to background tasks to avoid blocking
         background_tasks.add_task(
@@ -32,6 +49,32 @@ async def n8n_webhook(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _verify_webhook_signature(integration_type: str, headers: Dict[str, str], body: bytes) -> bool:
+    """Verify a provider HMAC-SHA256 signature over the raw body.
+
+    hashlib.sha256 dispatches to OpenSSL (SHA-NI where available), so the
+    verify stays I/O-bound even for large payloads. Providers without a
+    configured secret are accepted unchanged.
+    """
+    if integration_type == "github" and settings.GITHUB_WEBHOOK_SECRET:
+        signature = headers.get("x-hub-signature-256", "")
+        if not signature.startswith("sha256="):
+            return False
+        expected = hmac.new(
+            settings.GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(expected, signature[len("sha256="):])
+
+    if integration_type == "slack" and settings.SLACK_SIGNING_SECRET:
+        timestamp = headers.get("x-slack-request-timestamp", "")
+        base_string = b"v0:" + timestamp.encode() + b":" + body
+        expected = "v0=" + hmac.new(
+            settings.SLACK_SIGNING_SECRET.encode(), base_string, hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(expected, headers.get("x-slack-signature", ""))
+
+    return True
+
 @router.post("/integration/{integration_type}")
 async def integration_webhook(
     integration_type: str,
@@ -43,27 +86,52 @@ async def integration_webhook(
         # Get request body and headers
         body = await request.body()
         headers = dict(request.headers)
-        
+
+        # Reject forged payloads before parsing or any DB writes
+        if not _verify_webhook_signature(integration_type, headers, body):
+            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+        parsed_body = orjson.loads(body) if body else {}
+
+        # Providers retry deliveries; key events on the provider-supplied
+        # id (falling back to a body digest) so replays are no-ops
+        event_id = (
+            headers.get("x-github-delivery")
+            or parsed_body.get("event_id")
+            or hashlib.sha256(body).hexdigest()
+        )
+
         webhook_data = {
             "integration_type": integration_type,
             "headers": headers,
-            "body": json.loads(body) if body else {},
-            "timestamp": __import__('datetime').datetime.utcnow().isoformat()
+            "body": parsed_body,
+            "timestamp": _utcnow_iso(),
+            "received_at": datetime.utcnow()
         }
-        
-        # Store webhook event for processing
+
+        # Store webhook event for processing (idempotent upsert)
         db = get_database()
-        await db.webhook_events.insert_one(webhook_data)
-        
+        result = await db.webhook_events.update_one(
+            {"_id": event_id},
+            {"$setOnInsert": webhook_data},
+            upsert=True
+        )
+
+        if result.upserted_id is None:
+            # Duplicate delivery; already stored and dispatched
+            return {"status": "webhook_duplicate"}
+
         # Process webhook in background
         background_tasks.add_task(
             process_integration_webhook,
             integration_type,
             webhook_data
         )
-        
+
         return {"status": "webhook_processed"}
-    
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -79,32 +147,42 @@ async def process_integration_webhook(integration_type: str, webhook_data: Dict[
             "status": "active"
         }).to_list(100)
         
-        for workflow in workflows:
-            # Check if webhook matches trigger conditions
-            trigger_config = workflow.get("trigger_config", {})
-            
-            # Simple event matching (can be extended)
-            if matches_trigger_conditions(webhook_data, trigger_config):
-                # Execute workflow
-                await workflow_service.execute_workflow(
+        # Fire all matching workflows concurrently instead of awaiting each
+        # in turn; one failing workflow must not block the others
+        results = await asyncio.gather(
+            *(
+                workflow_service.execute_workflow(
                     workflow["id"],
                     workflow["user_id"],
                     webhook_data["body"]
                 )
-    
+                for workflow in workflows
+                if matches_trigger_conditions(webhook_data, workflow.get("trigger_config", {}))
+            ),
+            return_exceptions=True
+        )
+
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Webhook workflow execution error: {result}")
+
     except Exception as e:
         # Log error (in production, use proper logging)
         print(f"Webhook processing error: {e}")
 
+# Keys checked, in order, for the event name in a webhook body; the
+# first truthy value is the event, mirroring `type or action or event_type`
+_EVENT_KEYS = ("type", "action", "event_type")
+
 def matches_trigger_conditions(webhook_data: Dict[str, Any], trigger_config: Dict[str, Any]) -> bool:
     """Check if webhook data matches trigger conditions"""
-    # Basic event type matching
-    expected_event = trigger_config.get("event_type")
-    if expected_event:
-        body = webhook_data.get("body", {})
-        actual_event = body.get("type") or body.get("action") or body.get("event_type")
-        if actual_event != expected_event:
-            return False
-    
-    # Add more sophisticated matching logic here
-    return True
\ No newline at end of file
+    expected = trigger_config.get("event_type")
+    if not expected:
+        return True
+
+    body = webhook_data.get("body", {})
+    for key in _EVENT_KEYS:
+        actual_event = body.get(key)
+        if actual_event:
+            return actual_event == expected
+    return False
\ No newline at end of file
@@ -40,7 +40,8 @@ async def get_workflow(
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    return WorkflowResponse(
+    # Field-for-field copy of an already-validated model; skip revalidation
+    return WorkflowResponse.model_construct(
         id=workflow.id,
         name=workflow.name,
         description=workflow.description,
@@ -70,7 +71,7 @@ async def add_workflow_step(
 ):
     """Add step to workflow"""
     new_step = await workflow_service.add_workflow_step(workflow_id, current_user.id, step)
-    return {"message": "Step added successfully", "step": new_step.dict()}
+    return {"message": "Step added successfully", "step": new_step.model_dump()}
 
 @router.put("/{workflow_id}/steps/{step_id}")
 async def update_workflow_step(
@@ -133,7 +134,11 @@ async def execute_workflow(
             detail=f"Execution failed: {str(e)}"
         )
 
-@router.get("/{workflow_id}/executions", response_model=List[WorkflowExecutionResponse])
+@router.get(
+    "/{workflow_id}/executions",
+    response_model=List[WorkflowExecutionResponse],
+    response_model_exclude_none=True
+)
 async def get_workflow_executions(
     workflow_id: str,
     current_user: UserResponse = Depends(get_current_active_user),
@@ -0,0 +1,15 @@
+import time
+from datetime import datetime
+
+# Millisecond-granularity cached clock. Model default_factory slots call
+# this once per field per instance; bulk construction loops would otherwise
+# pay a clock syscall and datetime build per row.
+_now_cache = [datetime.utcnow(), time.monotonic()]
+
+def now() -> datetime:
+    """Current UTC time, cached for up to 1ms between reads"""
+    t = time.monotonic()
+    if t - _now_cache[1] > 0.001:
+        _now_cache[0] = datetime.utcnow()
+        _now_cache[1] = t
+    return _now_cache[0]
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 from pydantic_settings import BaseSettings
@@ -33,6 +34,9 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     ANTHROPIC_API_KEY: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
     EMERGENT_LLM_KEY: Optional[str] = os.getenv("EMERGENT_LLM_KEY")
+    # Post to /chat/completions directly instead of going through the SDK;
+    # avoids SDK object allocation under high concurrency
+    OPENAI_FAST_PATH: bool = os.getenv("OPENAI_FAST_PATH", "false").lower() == "true"
     
     # n8n Configuration
     N8N_BASE_URL: str = os.getenv("N8N_BASE_URL", "http://localhost:5678")
@@ -52,6 +56,10 @@ class Settings(BaseSettings):
     FIGMA_CLIENT_SECRET: Optional[str] = os.getenv("FIGMA_CLIENT_SECRET")
     JIRA_CLIENT_ID: Optional[str] = os.getenv("JIRA_CLIENT_ID")
     JIRA_CLIENT_SECRET: Optional[str] = os.getenv("JIRA_CLIENT_SECRET")
+
+    # Webhook signing secrets (verification is skipped when unset)
+    GITHUB_WEBHOOK_SECRET: Optional[str] = os.getenv("GITHUB_WEBHOOK_SECRET")
+    SLACK_SIGNING_SECRET: Optional[str] = os.getenv("SLACK_SIGNING_SECRET")
     
     # Background Jobs
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
@@ -60,12 +68,25 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
     RATE_LIMIT_PER_HOUR: int = int(os.getenv("RATE_LIMIT_PER_HOUR", "1000"))
+
+    # Auth token verification cache
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+    AUTH_CACHE_MAX: int = int(os.getenv("AUTH_CACHE_MAX", "10000"))
     
     # Monitoring
     SENTRY_DSN: Optional[str] = os.getenv("SENTRY_DSN")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
-    class Config:
-        case_sensitive = True
+    model_config = {"case_sensitive": True, "frozen": True, "extra": "ignore"}
+
+@lru_cache
+def get_settings() -> Settings:
+    """Build the settings once; cached so tests can re-instantiate cheaply"""
+    return Settings()
+
+settings = get_settings()
 
-settings = Settings()
\ No newline at end of file
+# Hot-path constants: bound once at import so per-request code skips the
+# Pydantic attribute descriptors
+RL_MIN = settings.RATE_LIMIT_PER_MINUTE
+RL_HOUR = settings.RATE_LIMIT_PER_HOUR
\ No newline at end of file
@@ -0,0 +1,69 @@
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from fastapi import HTTPException
+
+from app.core.config import RL_MIN, RL_HOUR
+from app.db.redis import check_rate_limit_buckets
+
+# Paths served without a bearer token
+PUBLIC_PREFIXES = (
+    "/api/auth/login",
+    "/api/auth/register",
+    "/api/auth/refresh",
+    "/api/webhooks",
+    "/api/integrations/oauth",
+    "/api/integrations/available",
+)
+
+class AuthRateLimitMiddleware(BaseHTTPMiddleware):
+    """Resolve auth and rate limiting once per request at the ASGI layer.
+
+    Verifies the bearer token (through the shared token cache) and stashes
+    the principal on request.state.user, and applies the token-bucket rate
+    limit for the write-heavy endpoints, so route dependencies become
+    plain attribute reads instead of a chain of coroutine frames.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if not path.startswith("/api") or path.startswith(PUBLIC_PREFIXES):
+            return await call_next(request)
+
+        authorization = request.headers.get("authorization")
+        if authorization and authorization.lower().startswith("bearer "):
+            # Imported lazily to avoid a circular import at app startup
+            from app.api.deps import resolve_bearer_token
+
+            try:
+                user = await resolve_bearer_token(authorization[7:])
+            except HTTPException as exc:
+                return JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+
+            request.state.user = user
+
+            # Same endpoints rate_limit_check covers: message sends and
+            # workflow/integration executes
+            if request.method == "POST" and (
+                path.endswith("/messages") or path.endswith("/execute")
+            ):
+                rate_limit_key = f"rate_limit:user:{user.id}"
+                check = await check_rate_limit_buckets(
+                    f"{rate_limit_key}:minute",
+                    f"{rate_limit_key}:hour",
+                    RL_MIN,
+                    RL_HOUR
+                )
+                if not check["minute_allowed"]:
+                    return JSONResponse(
+                        {"detail": "Rate limit exceeded - too many requests per minute"},
+                        status_code=429
+                    )
+                if not check["hour_allowed"]:
+                    return JSONResponse(
+                        {"detail": "Rate limit exceeded - too many requests per hour"},
+                        status_code=429
+                    )
+                request.state.rate_limited = True
+
+        return await call_next(request)
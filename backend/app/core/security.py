@@ -1,23 +1,75 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from threading import Lock
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from cachetools import TTLCache
+from argon2.exceptions import VerifyMismatchError, InvalidHashError
+import bcrypt
+from cryptography.fernet import Fernet, InvalidToken
+# PyJWT routes HS256 through OpenSSL rather than pure Python
+import jwt
+from jwt import InvalidTokenError as JWTError
 from fastapi import HTTPException, status
 from pydantic import ValidationError
 import uuid
 
 from app.core.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: argon2id with OWASP-recommended parameters, through the
+# native argon2-cffi binding. bcrypt is kept only to verify legacy rows.
+ph = PasswordHasher(
+    time_cost=3,
+    memory_cost=65536,
+    parallelism=2,
+    hash_len=32,
+    salt_len=16
+)
 
 def create_password_hash(password: str) -> str:
     """Create password hash"""
-    return pwd_context.hash(password)
+    return ph.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith("$argon2"):
+        try:
+            return ph.verify(hashed_password, plain_password)
+        except (VerifyMismatchError, InvalidHashError):
+            return False
+
+    # Legacy bcrypt hash: direct call into the bcrypt C extension (no
+    # passlib scheme dispatch); checkpw compares in constant time
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when a stored hash should be upgraded to current parameters"""
+    if not hashed_password.startswith("$argon2"):
+        return True
+    return ph.check_needs_rehash(hashed_password)
+
+# Password hashing intentionally burns 50-250ms of CPU; a per-core thread
+# pool keeps it off the event loop (installed as the default executor in
+# main.py's lifespan). Request paths must call the async wrappers below —
+# the sync functions exist for scripts and the wrappers themselves.
+hashing_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+async def acreate_password_hash(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await asyncio.to_thread(create_password_hash, password)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create access token"""
@@ -34,37 +86,95 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     """Create refresh token"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # jti allows individual refresh tokens to be rotated/revoked statelessly
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+# Bound once; building these per decode allocates on the request path
+_ALGS = [settings.ALGORITHM]
+_OPTS = {"verify_aud": False}
+
+# Decoded-token cache: skips signature verification and JSON parsing for
+# tokens seen recently. Keys are digests so raw tokens never sit in memory.
+_jwt_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+_jwt_lock = Lock()
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def invalidate_token(token: str):
+    """Drop a token from the decode cache (e.g. on logout)"""
+    with _jwt_lock:
+        _jwt_cache.pop(_token_cache_key(token), None)
+
 def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
     """Verify and decode token"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        if payload.get("type") != token_type:
+    cache_key = _token_cache_key(token)
+
+    with _jwt_lock:
+        payload = _jwt_cache.get(cache_key)
+
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=_ALGS, options=_OPTS)
+        except JWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type"
+                detail="Could not validate credentials"
             )
-        return payload
-    except JWTError:
+        with _jwt_lock:
+            _jwt_cache[cache_key] = payload
+    elif payload.get("exp", 0) <= time.time():
+        # The cache TTL can outlive a short-lived token; re-check expiry
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
 
+    if not hmac.compare_digest(payload.get("type", ""), token_type):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type"
+        )
+    return payload
+
 def generate_uuid() -> str:
     """Generate UUID string"""
-    return str(uuid.uuid4())
+    # .hex matches the model id default_factory format and is 4 bytes
+    # shorter on the wire than the hyphenated form
+    return uuid.uuid4().hex
+
+def generate_uuids(n: int) -> list:
+    """Generate n UUID strings with one amortized CSPRNG read"""
+    buf = os.urandom(16 * n)
+    return [buf[i:i + 16].hex() for i in range(0, 16 * n, 16)]
+
+# OAuth token encryption: Fernet (AES-128-CBC + HMAC) through the C-backed
+# cryptography package, keyed off SECRET_KEY
+_token_fernet = Fernet(
+    base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest())
+)
 
 def encrypt_oauth_token(token: str) -> str:
     """Encrypt OAuth token for storage"""
-    # In production, use proper encryption
-    # For now, just return the token (implement AES encryption later)
-    return token
+    if not token:
+        return token
+    return _token_fernet.encrypt(token.encode()).decode()
 
 def decrypt_oauth_token(encrypted_token: str) -> str:
     """Decrypt OAuth token"""
-    # In production, use proper decryption
-    # For now, just return the token (implement AES decryption later)
-    return encrypted_token
\ No newline at end of file
+    if not encrypted_token:
+        return encrypted_token
+    try:
+        return _token_fernet.decrypt(encrypted_token.encode()).decode()
+    except InvalidToken:
+        # Rows written before encryption landed hold the raw token
+        return encrypted_token
+
+async def aencrypt_oauth_token(token: str) -> str:
+    """Encrypt an OAuth token without blocking the event loop"""
+    return await asyncio.to_thread(encrypt_oauth_token, token)
+
+async def adecrypt_oauth_token(encrypted_token: str) -> str:
+    """Decrypt an OAuth token without blocking the event loop"""
+    return await asyncio.to_thread(decrypt_oauth_token, encrypted_token)
\ No newline at end of file
@@ -2,6 +2,7 @@ import asyncio
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.server_api import ServerApi
 import logging
 
 from app.core.config import settings
@@ -17,16 +18,27 @@ mongodb = MongoDB()
 async def connect_to_mongo():
     """Create database connection"""
     logger.info("Connecting to MongoDB...")
-    mongodb.client = AsyncIOMotorClient(settings.MONGO_URL)
+    # Wire compression roughly halves on-wire bytes for the JSON-heavy
+    # conversation/message documents; the server advertises what it
+    # supports and the driver falls back to uncompressed if nothing matches
+    mongodb.client = AsyncIOMotorClient(
+        settings.MONGO_URL,
+        server_api=ServerApi('1'),
+        compressors="zstd,snappy",
+        maxPoolSize=200,
+        retryWrites=True
+    )
     mongodb.database = mongodb.client[settings.DB_NAME]
-    
-    # Test connection
-    try:
-        await mongodb.client.admin.command('ping')
-        logger.info("Successfully connected to MongoDB")
-    except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
-        raise
+
+    # Motor connects lazily on first operation; an eager ping only buys an
+    # early failure, so pay the startup round trip in debug runs only
+    if settings.DEBUG:
+        try:
+            await mongodb.client.admin.command('ping')
+            logger.info("Successfully connected to MongoDB")
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            raise
 
 async def close_mongo_connection():
     """Close database connection"""
@@ -34,72 +46,103 @@ async def close_mongo_connection():
     if mongodb.client:
         mongodb.client.close()
 
+async def _ensure_indexes(collection_name: str, indexes: list):
+    """Ensure indexes on one collection, logging instead of raising"""
+    try:
+        await mongodb.database[collection_name].create_indexes(indexes)
+    except Exception as e:
+        logger.error(f"Failed to create indexes on {collection_name}: {e}")
+
 async def create_indexes():
     """Create database indexes for optimal performance"""
     if not mongodb.database:
         return
-    
-    # Users collection indexes
-    await mongodb.database.users.create_indexes([
-        IndexModel([("email", ASCENDING)], unique=True),
-        IndexModel([("team_id", ASCENDING)]),
-        IndexModel([("created_at", DESCENDING)])
-    ])
-    
-    # Teams collection indexes  
-    await mongodb.database.teams.create_indexes([
-        IndexModel([("owner_id", ASCENDING)]),
-        IndexModel([("created_at", DESCENDING)])
-    ])
-    
-    # Integrations collection indexes
-    await mongodb.database.integrations.create_indexes([
-        IndexModel([("user_id", ASCENDING)]),
-        IndexModel([("team_id", ASCENDING)]),
-        IndexModel([("integration_type", ASCENDING)]),
-        IndexModel([("user_id", ASCENDING), ("integration_type", ASCENDING)]),
-        IndexModel([("created_at", DESCENDING)])
-    ])
-    
-    # Conversations collection indexes
-    await mongodb.database.conversations.create_indexes([
-        IndexModel([("user_id", ASCENDING)]),
-        IndexModel([("team_id", ASCENDING)]),
-        IndexModel([("last_activity", DESCENDING)]),
-        IndexModel([("created_at", DESCENDING)])
-    ])
-    
-    # Messages collection indexes
-    await mongodb.database.messages.create_indexes([
-        IndexModel([("conversation_id", ASCENDING)]),
-        IndexModel([("conversation_id", ASCENDING), ("created_at", ASCENDING)]),
-        IndexModel([("created_at", DESCENDING)])
-    ])
-    
-    # Workflows collection indexes
-    await mongodb.database.workflows.create_indexes([
-        IndexModel([("user_id", ASCENDING)]),
-        IndexModel([("team_id", ASCENDING)]),
-        IndexModel([("status", ASCENDING)]),
-        IndexModel([("trigger_type", ASCENDING)]),
-        IndexModel([("created_at", DESCENDING)])
-    ])
-    
-    # Workflow executions collection indexes
-    await mongodb.database.workflow_executions.create_indexes([
-        IndexModel([("workflow_id", ASCENDING)]),
-        IndexModel([("user_id", ASCENDING)]),
-        IndexModel([("status", ASCENDING)]),
-        IndexModel([("started_at", DESCENDING)])
-    ])
-    
-    # OAuth states collection indexes (with TTL)
-    await mongodb.database.oauth_states.create_indexes([
-        IndexModel([("user_id", ASCENDING)]),
-        IndexModel([("state", ASCENDING)], unique=True),
-        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=3600)  # TTL index
-    ])
-    
+
+    collection_indexes = {
+        "users": [
+            IndexModel([("email", ASCENDING)], unique=True),
+            # Auth resolves users by application id on every request
+            IndexModel([("id", ASCENDING)], unique=True),
+            IndexModel([("team_id", ASCENDING)]),
+            IndexModel([("created_at", DESCENDING)])
+        ],
+        "teams": [
+            IndexModel([("owner_id", ASCENDING)]),
+            IndexModel([("created_at", DESCENDING)])
+        ],
+        "integrations": [
+            # Point lookups (delete, execute) address rows by application id
+            IndexModel([("id", ASCENDING)], unique=True),
+            IndexModel([("user_id", ASCENDING)]),
+            IndexModel([("team_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("integration_type", ASCENDING)]),
+            # Partial index: point lookups only ever target connected
+            # integrations, so inactive/error/pending rows stay out of it
+            IndexModel(
+                [("user_id", ASCENDING), ("integration_type", ASCENDING), ("status", ASCENDING)],
+                partialFilterExpression={"status": "active"}
+            ),
+            IndexModel([("created_at", DESCENDING)])
+        ],
+        # ESR (Equality, Sort, Range) compound indexes; single-field
+        # prefixes already covered by a compound are omitted to keep
+        # write amplification down
+        "conversations": [
+            IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING), ("last_activity", DESCENDING)]),
+            IndexModel([("team_id", ASCENDING), ("is_active", ASCENDING), ("last_activity", DESCENDING)]),
+            IndexModel([("last_activity", DESCENDING)]),
+            IndexModel([("created_at", DESCENDING)])
+        ],
+        "messages": [
+            IndexModel([("conversation_id", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("conversation_id", ASCENDING), ("user_id", ASCENDING), ("created_at", ASCENDING)]),
+            IndexModel([("created_at", DESCENDING)])
+        ],
+        "workflows": [
+            IndexModel([("id", ASCENDING)], unique=True),
+            IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)]),
+            # Partial index over runnable workflows only; draft/error rows
+            # are never matched by the scheduler or trigger dispatch
+            IndexModel(
+                [("team_id", ASCENDING), ("status", ASCENDING)],
+                partialFilterExpression={"status": {"$in": ["active", "paused"]}}
+            ),
+            IndexModel([("status", ASCENDING)]),
+            IndexModel([("trigger_type", ASCENDING)]),
+            IndexModel([("trigger_type", ASCENDING), ("trigger_config.integration_type", ASCENDING), ("status", ASCENDING)]),
+            IndexModel([("created_at", DESCENDING)])
+        ],
+        "workflow_executions": [
+            IndexModel([("id", ASCENDING)], unique=True),
+            # Execution history lists filter (workflow_id, user_id) and
+            # sort on started_at; the workflow_id prefix still covers the
+            # per-workflow deletes
+            IndexModel([("workflow_id", ASCENDING), ("user_id", ASCENDING), ("started_at", DESCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("status", ASCENDING), ("started_at", DESCENDING)]),
+            # The monitor sweep only ever asks for running executions
+            IndexModel(
+                [("status", ASCENDING)],
+                partialFilterExpression={"status": "running"}
+            ),
+            IndexModel([("started_at", DESCENDING)]),
+            # Executions auto-expire after 30 days, replacing the manual
+            # cleanup task
+            IndexModel([("started_at", ASCENDING)], expireAfterSeconds=30 * 86400)
+        ],
+        # Webhook events auto-expire after 7 days
+        "webhook_events": [
+            IndexModel([("received_at", ASCENDING)], expireAfterSeconds=7 * 86400)
+        ]
+        # OAuth state lives in Redis with a native TTL (see db/redis.py)
+    }
+
+    # Ensure all collections concurrently: startup pays one round trip
+    # worst-case instead of one per collection
+    await asyncio.gather(*(
+        _ensure_indexes(name, indexes)
+        for name, indexes in collection_indexes.items()
+    ))
+
     logger.info("Database indexes created successfully")
 
 def get_database() -> AsyncIOMotorDatabase:
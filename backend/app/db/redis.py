@@ -1,30 +1,93 @@
-import asyncio
-import json
-from typing import Optional, Any, Dict
+import time
+from typing import Optional, Any, Dict, List
+import orjson
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 import logging
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Token-bucket rate limiter: refills and decrements both windows atomically
+# so each rate-limit check costs a single Redis round trip
+RATE_LIMIT_BUCKETS_LUA = """
+local function take(key, now, cap, rate)
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(data[1])
+    local ts = tonumber(data[2])
+    if tokens == nil then
+        tokens = cap
+        ts = now
+    end
+    tokens = math.min(cap, tokens + (now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil((cap / rate) * 1000))
+    return allowed, math.floor(tokens)
+end
+
+local now = tonumber(ARGV[1])
+local m_allowed, m_left = take(KEYS[1], now, tonumber(ARGV[2]), tonumber(ARGV[3]))
+local h_allowed, h_left = take(KEYS[2], now, tonumber(ARGV[4]), tonumber(ARGV[5]))
+return {m_allowed, m_left, h_allowed, h_left}
+"""
+
+# Sliding-window rate limiter: the trim/count/add/expire sequence runs
+# server-side in one round trip instead of a four-command pipeline
+RATE_LIMIT_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local current = redis.call('ZCARD', key)
+redis.call('ZADD', key, now, tostring(now))
+redis.call('EXPIRE', key, window)
+return current
+"""
+
 class RedisManager:
     redis_client: Optional[redis.Redis] = None
+    connection_pool: Optional[redis.ConnectionPool] = None
+    rate_limit_script = None
+    rate_limit_window_script = None
 
 redis_manager = RedisManager()
 
 async def connect_to_redis():
     """Create Redis connection"""
     logger.info("Connecting to Redis...")
-    redis_manager.redis_client = redis.from_url(
-        settings.REDIS_URL, 
-        decode_responses=True,
+    # Values stay as bytes: orjson serializes straight to bytes and
+    # decode_responses would force a UTF-8 decode per value. The pool is
+    # bounded explicitly — the default cap is too low for pipelines plus a
+    # rate-limit check per request under burst load.
+    redis_manager.connection_pool = redis.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=200,
         socket_connect_timeout=30,
         socket_keepalive=True,
         socket_keepalive_options={},
-        retry_on_timeout=True
+        health_check_interval=30,
+        retry_on_timeout=True,
+        retry=Retry(ExponentialBackoff(), 3)
+    )
+    redis_manager.redis_client = redis.Redis(
+        connection_pool=redis_manager.connection_pool
     )
     
+    # Register server-side scripts once per connection
+    redis_manager.rate_limit_script = redis_manager.redis_client.register_script(
+        RATE_LIMIT_BUCKETS_LUA
+    )
+    redis_manager.rate_limit_window_script = redis_manager.redis_client.register_script(
+        RATE_LIMIT_WINDOW_LUA
+    )
+
     # Test connection
     try:
         await redis_manager.redis_client.ping()
@@ -38,6 +101,8 @@ async def close_redis_connection():
     logger.info("Closing connection to Redis...")
     if redis_manager.redis_client:
         await redis_manager.redis_client.aclose()
+    if redis_manager.connection_pool:
+        await redis_manager.connection_pool.disconnect()
 
 def get_redis() -> redis.Redis:
     """Get Redis instance"""
@@ -45,24 +110,38 @@ def get_redis() -> redis.Redis:
         raise Exception("Redis not connected")
     return redis_manager.redis_client
 
-# Cache utilities
+# Cache utilities. Every value is orjson-encoded on write, so reads decode
+# unconditionally — no type sniffing or exception-driven fallback per get.
 async def cache_set(key: str, value: Any, expire: int = 3600):
     """Set cache with expiration"""
     redis_client = get_redis()
-    if isinstance(value, (dict, list)):
-        value = json.dumps(value)
-    await redis_client.set(key, value, ex=expire)
+    await redis_client.set(key, orjson.dumps(value), ex=expire)
 
 async def cache_get(key: str) -> Optional[Any]:
     """Get cache value"""
     redis_client = get_redis()
-    value = await redis_client.get(key)
-    if value:
-        try:
-            return json.loads(value)
-        except json.JSONDecodeError:
-            return value
-    return None
+    raw = await redis_client.get(key)
+    return orjson.loads(raw) if raw else None
+
+async def cache_mget(keys: List[str]) -> List[Optional[Any]]:
+    """Get multiple cache values in one round trip (MGET)"""
+    if not keys:
+        return []
+    redis_client = get_redis()
+    values = await redis_client.mget(keys)
+    return [orjson.loads(raw) if raw else None for raw in values]
+
+async def cache_mset(items: Dict[str, Any], expire: int = 3600):
+    """Set multiple cache values with expiration in one round trip"""
+    if not items:
+        return
+    redis_client = get_redis()
+    # Non-transactional pipeline: the SETs are independent, so there is no
+    # need to pay for MULTI/EXEC
+    pipe = redis_client.pipeline(transaction=False)
+    for key, value in items.items():
+        pipe.set(key, orjson.dumps(value), ex=expire)
+    await pipe.execute()
 
 async def cache_delete(key: str):
     """Delete cache key"""
@@ -87,21 +166,68 @@ async def delete_session(session_id: str):
     """Delete session"""
     await cache_delete(f"session:{session_id}")
 
+# OAuth state: short-lived, never queried by secondary keys, so it lives
+# in Redis with a native TTL instead of a MongoDB TTL collection
+async def put_oauth_state(state: str, payload: Dict[str, Any], ttl: int = 600) -> bool:
+    """Store an OAuth state payload; NX guarantees state uniqueness"""
+    redis_client = get_redis()
+    return bool(await redis_client.set(
+        f"oauth:{state}", orjson.dumps(payload), ex=ttl, nx=True
+    ))
+
+async def pop_oauth_state(state: str) -> Optional[Dict[str, Any]]:
+    """Atomically fetch and delete an OAuth state in one round trip"""
+    # GETDEL (Redis 6.2+) closes the replay window a GET+DEL pipeline
+    # leaves open: two racing callbacks can both GET before either DELETEs
+    redis_client = get_redis()
+    value = await redis_client.getdel(f"oauth:{state}")
+    return orjson.loads(value) if value else None
+
 # Rate limiting
+async def check_rate_limit_buckets(
+    minute_key: str,
+    hour_key: str,
+    minute_limit: int,
+    hour_limit: int
+) -> Dict[str, Any]:
+    """Check per-minute and per-hour token buckets in one atomic round trip"""
+    if not redis_manager.rate_limit_script:
+        redis_client = get_redis()
+        redis_manager.rate_limit_script = redis_client.register_script(
+            RATE_LIMIT_BUCKETS_LUA
+        )
+
+    results = await redis_manager.rate_limit_script(
+        keys=[minute_key, hour_key],
+        args=[
+            time.time(),
+            minute_limit, minute_limit / 60,
+            hour_limit, hour_limit / 3600
+        ]
+    )
+
+    return {
+        "minute_allowed": bool(results[0]),
+        "minute_remaining": results[1],
+        "hour_allowed": bool(results[2]),
+        "hour_remaining": results[3]
+    }
+
 async def check_rate_limit(key: str, limit: int, window: int) -> Dict[str, Any]:
     """Check rate limit using sliding window"""
-    redis_client = get_redis()
-    current_time = int(asyncio.get_event_loop().time())
-    
-    pipe = redis_client.pipeline()
-    pipe.zremrangebyscore(key, 0, current_time - window)
-    pipe.zcard(key)
-    pipe.zadd(key, {str(current_time): current_time})
-    pipe.expire(key, window)
-    
-    results = await pipe.execute()
-    current_requests = results[1]
-    
+    if not redis_manager.rate_limit_window_script:
+        redis_client = get_redis()
+        redis_manager.rate_limit_window_script = redis_client.register_script(
+            RATE_LIMIT_WINDOW_LUA
+        )
+
+    current_time = int(time.time())
+    # register_script runs EVALSHA and transparently re-loads on NOSCRIPT
+    current_requests = await redis_manager.rate_limit_window_script(
+        keys=[key],
+        args=[current_time, window]
+    )
+
     return {
         "allowed": current_requests < limit,
         "current_requests": current_requests,
@@ -1,14 +1,20 @@
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
 
 from app.core.config import settings
+from app.core.middleware import AuthRateLimitMiddleware
+from app.core.security import hashing_executor
 from app.db.mongodb import connect_to_mongo, close_mongo_connection, create_indexes
 from app.db.redis import connect_to_redis, close_redis_connection
+from app.services.ai_service import ai_service
+from app.services.integration_service import integration_service
+from app.services.n8n_service import n8n_service
 
 # Import routers
 from app.api.auth import router as auth_router
@@ -29,20 +35,32 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting up Loki AI Platform Backend...")
-    
-    # Connect to databases
-    await connect_to_mongo()
-    await connect_to_redis()
-    
+
+    # Password hashing (and other to_thread work) runs on a per-core pool
+    asyncio.get_running_loop().set_default_executor(hashing_executor)
+
+    # Connect to both databases concurrently
+    await asyncio.gather(connect_to_mongo(), connect_to_redis())
+
     # Create database indexes
     await create_indexes()
-    
+
+    # Listen for integration writes so per-process caches stay coherent
+    ai_service.start_cache_invalidator()
+
+    # Warm the n8n connection pool off the critical path: readiness does
+    # not wait on the handshake, but the first workflow call skips it.
+    # The local keeps the task referenced for the generator's lifetime.
+    warmup_task = asyncio.create_task(n8n_service.warmup())  # noqa: F841
+
     logger.info("✅ Backend startup complete!")
-    
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down Loki AI Platform Backend...")
+    await ai_service.stop_cache_invalidator()
+    await asyncio.gather(integration_service.close(), n8n_service.close())
     await close_mongo_connection()
     await close_redis_connection()
     logger.info("✅ Backend shutdown complete!")
@@ -52,9 +70,13 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="AI-Powered Productivity Platform Backend - Connect tools, automate workflows, chat with AI",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Resolve auth + rate limiting once per request
+app.add_middleware(AuthRateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -95,7 +117,7 @@ async def health_check():
         # (database connectivity, external services, etc.)
         return {
             "status": "healthy",
-            "timestamp": __import__('datetime').datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcnow().isoformat(),
             "version": settings.APP_VERSION
         }
     except Exception as e:
@@ -104,7 +126,7 @@ async def health_check():
             content={
                 "status": "unhealthy",
                 "error": str(e),
-                "timestamp": __import__('datetime').datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow().isoformat()
             }
         )
 
@@ -122,5 +144,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8001,
         reload=settings.DEBUG,
-        log_level=settings.LOG_LEVEL.lower()
+        log_level=settings.LOG_LEVEL.lower(),
+        loop="uvloop",
+        http="httptools",
+        ws_per_message_deflate=True,
+        ws_max_size=1024 * 1024
     )
\ No newline at end of file
@@ -1,8 +1,11 @@
 from datetime import datetime
+from uuid import uuid4
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
+from app.core.clock import now
+
 class ChatType(str, Enum):
     DIRECT = "direct"  # Direct user-AI chat
     TEAM = "team"      # Team chat with AI
@@ -20,7 +23,10 @@ class ThinkingMode(str, Enum):
     DEEP = "deep"
 
 class Conversation(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     user_id: str
     team_id: str
     chat_type: ChatType = ChatType.DIRECT
@@ -36,13 +42,17 @@ class Conversation(BaseModel):
     
     # Metadata
     is_active: bool = True
-    last_activity: datetime = Field(default_factory=datetime.utcnow)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    last_activity: datetime = Field(default_factory=now)
+    created_at: datetime = Field(default_factory=now)
+    updated_at: datetime = Field(default_factory=now)
 
 class Message(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     conversation_id: str
+    user_id: Optional[str] = None  # Denormalized owner for single-query reads
     role: MessageRole
     content: str
     
@@ -52,7 +62,7 @@ class Message(BaseModel):
     
     # Metadata
     metadata: Dict[str, Any] = Field(default_factory=dict)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now)
 
 class ConversationCreate(BaseModel):
     title: str
@@ -65,6 +75,9 @@ class MessageCreate(BaseModel):
     thinking_mode: Optional[ThinkingMode] = None
 
 class ConversationResponse(BaseModel):
+    # Serialize enum fields as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     title: str
     chat_type: ChatType
@@ -76,6 +89,9 @@ class ConversationResponse(BaseModel):
     created_at: datetime
 
 class MessageResponse(BaseModel):
+    # Serialize enum fields as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     role: MessageRole
     content: str
@@ -86,9 +102,12 @@ class MessageResponse(BaseModel):
 
 class ChatSession(BaseModel):
     """Real-time chat session data"""
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     conversation_id: str
     user_id: str
     connection_id: str  # WebSocket connection ID
     is_active: bool = True
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=now)
\ No newline at end of file
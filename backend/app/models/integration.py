@@ -1,8 +1,11 @@
 from datetime import datetime
+from uuid import uuid4
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
+from app.core.clock import now
+
 class IntegrationType(str, Enum):
     SLACK = "slack"
     GOOGLE = "google"
@@ -25,7 +28,10 @@ class IntegrationStatus(str, Enum):
     PENDING = "pending"
 
 class Integration(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     user_id: str
     team_id: str
     integration_type: IntegrationType
@@ -49,8 +55,8 @@ class Integration(BaseModel):
     last_sync: Optional[datetime] = None
     sync_enabled: bool = True
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now)
+    updated_at: datetime = Field(default_factory=now)
 
 class IntegrationCreate(BaseModel):
     integration_type: IntegrationType
@@ -64,6 +70,9 @@ class IntegrationUpdate(BaseModel):
     sync_enabled: Optional[bool] = None
 
 class IntegrationResponse(BaseModel):
+    # Serialize enum fields as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     integration_type: IntegrationType
     name: str
@@ -76,13 +85,16 @@ class IntegrationResponse(BaseModel):
     created_at: datetime
 
 class OAuthState(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     user_id: str
     integration_type: IntegrationType
     state: str
     redirect_uri: Optional[str] = None
     expires_at: datetime
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now)
 
 # Integration capabilities and permissions
 INTEGRATION_CONFIGS = {
@@ -1,8 +1,11 @@
 from datetime import datetime
+from uuid import uuid4
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from enum import Enum
 
+from app.core.clock import now
+
 class UserRole(str, Enum):
     ADMIN = "admin"
     MEMBER = "member"
@@ -14,7 +17,10 @@ class SubscriptionPlan(str, Enum):
     ENTERPRISE = "enterprise"
 
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     email: EmailStr
     hashed_password: str
     full_name: Optional[str] = None
@@ -24,8 +30,8 @@ class User(BaseModel):
     team_id: Optional[str] = None
     role: UserRole = UserRole.MEMBER
     settings: Dict[str, Any] = Field(default_factory=dict)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now)
+    updated_at: datetime = Field(default_factory=now)
     last_login: Optional[datetime] = None
 
 class UserCreate(BaseModel):
@@ -39,6 +45,9 @@ class UserUpdate(BaseModel):
     settings: Optional[Dict[str, Any]] = None
 
 class UserResponse(BaseModel):
+    # Serialize enum fields as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     email: str
     full_name: Optional[str]
@@ -52,7 +61,10 @@ class UserResponse(BaseModel):
     last_login: Optional[datetime]
 
 class Team(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     name: str
     description: Optional[str] = None
     owner_id: str
@@ -64,14 +76,17 @@ class Team(BaseModel):
         "max_workflows": 10,
         "max_ai_requests_per_month": 1000
     })
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now)
+    updated_at: datetime = Field(default_factory=now)
 
 class TeamCreate(BaseModel):
     name: str
     description: Optional[str] = None
 
 class TeamResponse(BaseModel):
+    # Serialize enum fields as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     name: str
     description: Optional[str]
@@ -1,8 +1,11 @@
 from datetime import datetime
+from uuid import uuid4
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
+from app.core.clock import now
+
 class WorkflowStatus(str, Enum):
     DRAFT = "draft"
     ACTIVE = "active"
@@ -30,7 +33,7 @@ class ExecutionStatus(str, Enum):
     CANCELLED = "cancelled"
 
 class WorkflowStep(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    id: str = Field(default_factory=lambda: uuid4().hex)
     name: str
     action_type: ActionType
     integration_id: Optional[str] = None  # Required for integration actions
@@ -50,7 +53,10 @@ class WorkflowStep(BaseModel):
     depends_on: List[str] = Field(default_factory=list)  # Step IDs this depends on
 
 class Workflow(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     user_id: str
     team_id: str
     name: str
@@ -76,11 +82,14 @@ class Workflow(BaseModel):
     max_concurrent_executions: int = 1
     execution_timeout_minutes: int = 30
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=now)
+    updated_at: datetime = Field(default_factory=now)
 
 class WorkflowExecution(BaseModel):
-    id: str = Field(default_factory=lambda: __import__('uuid').uuid4().hex)
+    # Mongo documents carry _id and occasionally stale fields
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: uuid4().hex)
     workflow_id: str
     user_id: str
     
@@ -94,7 +103,7 @@ class WorkflowExecution(BaseModel):
     error_message: Optional[str] = None
     
     # Timing
-    started_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime = Field(default_factory=now)
     completed_at: Optional[datetime] = None
     duration_seconds: Optional[float] = None
     
@@ -106,6 +115,9 @@ class WorkflowCreate(BaseModel):
     description: Optional[str] = None
     trigger_type: TriggerType
     trigger_config: Dict[str, Any] = Field(default_factory=dict)
+    # Optional initial steps (template imports); order is assigned by the
+    # service so callers don't have to number them
+    steps: List[WorkflowStep] = Field(default_factory=list)
 
 class WorkflowUpdate(BaseModel):
     name: Optional[str] = None
@@ -114,6 +126,9 @@ class WorkflowUpdate(BaseModel):
     status: Optional[WorkflowStatus] = None
 
 class WorkflowResponse(BaseModel):
+    # Serialize enum fields as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     name: str
     description: Optional[str]
@@ -126,6 +141,9 @@ class WorkflowResponse(BaseModel):
     updated_at: datetime
 
 class WorkflowExecutionResponse(BaseModel):
+    # Serialize enum fields as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+
     id: str
     workflow_id: str
     status: ExecutionStatus
@@ -1,8 +1,11 @@
 import asyncio
-import json
+import hashlib
+import sys
 from typing import Dict, List, Any, Optional, AsyncGenerator
 from datetime import datetime
 import httpx
+import orjson
+from cachetools import TTLCache
 from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 
@@ -10,36 +13,176 @@ from app.core.config import settings
 from app.models.chat import ThinkingMode, MessageRole
 from app.models.integration import IntegrationType
 from app.db.mongodb import get_database
+from app.db.redis import cache_get, cache_set, get_redis
 from app.services.integration_service import integration_service
 
+# Hot-path constants: rebuilt per call these allocate and GC the same
+# objects on every request.
+
+# Static prefix kept stable (and first) so provider prompt caching can
+# reuse it across users and turns
+_SYSTEM_BASE = """You are Loki, an AI productivity assistant that helps users accomplish tasks across multiple integrated tools and platforms.
+
+Your capabilities include:
+- Analyzing and processing information across connected services
+- Executing actions in integrated tools (Slack, Google Workspace, GitHub, etc.)
+- Creating workflows and automations
+- Providing insights and recommendations
+
+"""
+_BASE_BLOCK = {"text": _SYSTEM_BASE, "cache": True}
+
+# Pre-rendered per-mode tail blocks (the only volatile part of the prompt)
+_MODE_BLOCKS = {
+    mode: {"text": f"\nThinking mode: {prompt}\n", "cache": False}
+    for mode, prompt in {
+        ThinkingMode.QUICK: "Provide quick, concise responses. Focus on efficiency.",
+        ThinkingMode.MEDIUM: "Provide balanced responses with sufficient detail and reasoning.",
+        ThinkingMode.DEEP: "Provide thorough, comprehensive responses with detailed analysis and reasoning."
+    }.items()
+}
+
+_MODEL_PARAMS = {
+    ThinkingMode.QUICK: {"temperature": 0.3, "max_tokens": 512},
+    ThinkingMode.MEDIUM: {"temperature": 0.7, "max_tokens": 1024},
+    ThinkingMode.DEEP: {"temperature": 0.9, "max_tokens": 2048}
+}
+
+# Interned once; these exact strings are written with every saved message
+_ROLE_USER = sys.intern(MessageRole.USER.value)
+_ROLE_ASSISTANT = sys.intern(MessageRole.ASSISTANT.value)
+
+class LLMCache:
+    """Redis-backed response cache for deterministic-enough LLM calls.
+
+    Keys cover everything that shapes a completion (model, system prompt,
+    message history, tools, temperature), so identical turns short-circuit
+    the provider call entirely. Only low-temperature requests are cached —
+    high-temperature responses are intentionally varied.
+    """
+
+    def __init__(self, ttl: int = 3600, max_temperature: float = 0.3):
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(model: str, system_prompt: Any, messages: List[Dict],
+                 tools: List[Dict], temperature: float) -> str:
+        payload = orjson.dumps([model, system_prompt, messages, tools, temperature])
+        return f"llm:{hashlib.sha256(payload).hexdigest()}"
+
+    def cacheable(self, temperature: float) -> bool:
+        return temperature <= self.max_temperature
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            cached = await cache_get(key)
+        except Exception:
+            return None
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, response: Dict[str, Any]):
+        # Tool calls run against user-specific integrations; their results
+        # must never be replayed to another conversation
+        if response.get("tool_calls"):
+            return
+        try:
+            await cache_set(key, response, expire=self.ttl)
+        except Exception:
+            pass
+
 class AIService:
+    # Pool sized for many concurrent process_message calls: default httpx
+    # limits serialize requests on the pool under chat load. HTTP/2
+    # multiplexes streams over few connections where upstreams support it.
+    _HTTP_LIMITS = httpx.Limits(
+        max_connections=2000,
+        max_keepalive_connections=500,
+        keepalive_expiry=60
+    )
+    # LLM completions are slow; generous read timeout, tight connect
+    _HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
     def __init__(self):
         self.db = None
         self.openai_client = None
         self.anthropic_client = None
         self.emergent_client = None
-        
+        self.llm_cache = LLMCache()
+        # The tool schema is static; building it per request allocated and
+        # GC'd the same nested dicts on every LLM call
+        self._tools = self._build_tools()
+        # In-flight calls keyed like the cache: concurrent identical
+        # requests await one upstream call instead of issuing N
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Strong refs to fire-and-forget save tasks so they are not GC'd
+        self._save_tasks: set = set()
+        # Integration membership and conversation context change rarely but
+        # are read on every turn; a short per-process TTL absorbs the
+        # repeat lookups. Integration writes publish an invalidate signal
+        # (see start_cache_invalidator), context relies on the TTL alone.
+        self._int_cache = TTLCache(maxsize=10_000, ttl=30)
+        self._ctx_cache = TTLCache(maxsize=10_000, ttl=30)
+        self._invalidator_task: Optional[asyncio.Task] = None
+
+        # One tuned transport shared by the SDK clients
+        self.http_client = httpx.AsyncClient(
+            limits=self._HTTP_LIMITS,
+            timeout=self._HTTP_TIMEOUT,
+            http2=True
+        )
+
         # Initialize clients based on available keys
+        self._raw_openai = None
         if settings.OPENAI_API_KEY:
-            self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        
+            self.openai_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=self.http_client
+            )
+            if settings.OPENAI_FAST_PATH:
+                # Raw completions endpoint: skips SDK response-object
+                # allocation, which degrades at high concurrency
+                self._raw_openai = httpx.AsyncClient(
+                    base_url="https://api.openai.com/v1",
+                    headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+                    limits=self._HTTP_LIMITS,
+                    timeout=self._HTTP_TIMEOUT,
+                    http2=True
+                )
+
         if settings.ANTHROPIC_API_KEY:
-            self.anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-        
+            try:
+                self.anthropic_client = AsyncAnthropic(
+                    api_key=settings.ANTHROPIC_API_KEY,
+                    http_client=self.http_client
+                )
+            except TypeError:
+                # Some SDK versions vendor their own httpx and reject a
+                # stock AsyncClient; fall back to the SDK-managed transport
+                self.anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+
         if settings.EMERGENT_LLM_KEY:
             self.emergent_client = self._init_emergent_client()
-    
+
     def _get_db(self):
         if not self.db:
             self.db = get_database()
         return self.db
-    
+
     def _init_emergent_client(self):
         """Initialize Emergent LLM client"""
         # This would integrate with Emergent's LLM service
         return httpx.AsyncClient(
             base_url="https://api.emergent.sh/v1",
-            headers={"Authorization": f"Bearer {settings.EMERGENT_LLM_KEY}"}
+            headers={"Authorization": f"Bearer {settings.EMERGENT_LLM_KEY}"},
+            limits=self._HTTP_LIMITS,
+            timeout=self._HTTP_TIMEOUT,
+            http2=True
         )
     
     async def process_message(
@@ -48,57 +191,89 @@ class AIService:
         conversation_id: str,
         message_content: str,
         thinking_mode: ThinkingMode = ThinkingMode.MEDIUM,
-        model: str = "gpt-4"
+        model: str = "gpt-4",
+        user_message_id: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Process user message and generate AI response"""
-        
-        # Get conversation context
-        context = await self._get_conversation_context(conversation_id)
-        
-        # Get active integrations for the user
-        active_integrations = await self._get_user_integrations(user_id)
+        """Process user message and generate AI response
+
+        When user_message_id is given the caller has already persisted the
+        user message, so only the assistant reply is saved here.
+        """
         
+        # Context, integrations, and history are independent reads; fetch
+        # them concurrently so pre-LLM latency is one round trip, not three
+        context, active_integrations, messages = await asyncio.gather(
+            self._get_conversation_context(conversation_id),
+            self._get_user_integrations(user_id),
+            self._prepare_messages(conversation_id, message_content, {})
+        )
+
         # Build system prompt based on integrations and context
         system_prompt = self._build_system_prompt(active_integrations, thinking_mode)
         
-        # Prepare messages for AI
-        messages = await self._prepare_messages(conversation_id, message_content, context)
-        
-        # Generate response based on model
-        if model.startswith("gpt-") and self.openai_client:
-            response = await self._generate_openai_response(messages, system_prompt, model, thinking_mode)
-        elif model.startswith("claude-") and self.anthropic_client:
-            response = await self._generate_anthropic_response(messages, system_prompt, model)
-        elif self.emergent_client:
-            response = await self._generate_emergent_response(messages, system_prompt, model)
+        # Identical low-temperature turns short-circuit the provider call
+        temperature = self._get_model_params(thinking_mode)["temperature"]
+        cache_key = None
+        if self.llm_cache.cacheable(temperature):
+            cache_key = LLMCache.make_key(
+                model, system_prompt, messages,
+                self._get_available_tools(), temperature
+            )
+            response = await self.llm_cache.get(cache_key)
+            if response is not None:
+                self._save_messages_background(
+                    user_id, conversation_id, message_content, response,
+                    user_message_id=user_message_id
+                )
+                return response
+
+        # Generate response based on model; identical deterministic requests
+        # arriving while one is already in flight share its result
+        if cache_key is not None:
+            response = await self._generate_coalesced(
+                cache_key, messages, system_prompt, model, thinking_mode
+            )
+            await self.llm_cache.put(cache_key, response)
         else:
-            raise Exception("No AI client available")
+            response = await self._dispatch_generate(messages, system_prompt, model, thinking_mode)
         
         # Process tool calls if any
         if response.get("tool_calls"):
             tool_results = await self._execute_tool_calls(user_id, response["tool_calls"])
             response["tool_results"] = tool_results
         
-        # Save messages to database
-        await self._save_messages(conversation_id, message_content, response)
-        
+        # Persist off the response path; the caller gets the reply while
+        # the writes complete in the background
+        self._save_messages_background(
+            user_id, conversation_id, message_content, response,
+            user_message_id=user_message_id
+        )
+
         return response
     
     async def _generate_openai_response(
-        self, 
+        self,
         messages: List[Dict],
-        system_prompt: str,
+        system_prompt: List[Dict[str, Any]],
         model: str,
         thinking_mode: ThinkingMode
     ) -> Dict[str, Any]:
         """Generate response using OpenAI"""
-        
+
         # Configure model parameters based on thinking mode
         model_params = self._get_model_params(thinking_mode)
-        
-        # Add system message
-        full_messages = [{"role": "system", "content": system_prompt}] + messages
-        
+
+        # Add system message; the stable prefix comes first so OpenAI's
+        # automatic prompt caching applies
+        full_messages = [{"role": "system", "content": self._flatten_system_prompt(system_prompt)}] + messages
+
+        if self._raw_openai is not None:
+            try:
+                return await self._generate_openai_raw(full_messages, model, model_params)
+            except Exception:
+                # Fall through to the SDK path on any fast-path failure
+                pass
+
         try:
             response = await self.openai_client.chat.completions.create(
                 model=model,
@@ -111,25 +286,59 @@ class AIService:
             
             return {
                 "content": message.content,
-                "role": MessageRole.ASSISTANT,
+                "role": _ROLE_ASSISTANT,
                 "tool_calls": [tool_call.dict() for tool_call in (message.tool_calls or [])],
                 "model": model,
                 "usage": response.usage.dict() if response.usage else None
             }
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
-    
+
+    async def _generate_openai_raw(
+        self,
+        full_messages: List[Dict],
+        model: str,
+        model_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """POST /chat/completions directly and parse the JSON ourselves"""
+        response = await self._raw_openai.post("/chat/completions", json={
+            "model": model,
+            "messages": full_messages,
+            "tools": self._get_available_tools(),
+            **model_params
+        })
+        response.raise_for_status()
+
+        data = orjson.loads(response.content)
+        message = data["choices"][0]["message"]
+
+        return {
+            "content": message.get("content"),
+            "role": _ROLE_ASSISTANT,
+            "tool_calls": message.get("tool_calls") or [],
+            "model": model,
+            "usage": data.get("usage")
+        }
+
     async def _generate_anthropic_response(
         self,
         messages: List[Dict],
-        system_prompt: str,
+        system_prompt: List[Dict[str, Any]],
         model: str
     ) -> Dict[str, Any]:
         """Generate response using Anthropic"""
         try:
+            # Stable blocks opt in to provider prompt caching; the volatile
+            # thinking-mode tail stays uncached
+            system_blocks = [
+                {"type": "text", "text": block["text"], "cache_control": {"type": "ephemeral"}}
+                if block["cache"] else
+                {"type": "text", "text": block["text"]}
+                for block in system_prompt
+            ]
             response = await self.anthropic_client.messages.create(
                 model=model,
-                system=system_prompt,
+                system=system_blocks,
                 messages=messages,
                 max_tokens=1024,
                 tools=self._get_available_tools()
@@ -137,7 +346,7 @@ class AIService:
             
             return {
                 "content": response.content[0].text if response.content else "",
-                "role": MessageRole.ASSISTANT,
+                "role": _ROLE_ASSISTANT,
                 "tool_calls": [],
                 "model": model,
                 "usage": {"input_tokens": response.usage.input_tokens, "output_tokens": response.usage.output_tokens}
@@ -148,26 +357,26 @@ class AIService:
     async def _generate_emergent_response(
         self,
         messages: List[Dict],
-        system_prompt: str,
+        system_prompt: List[Dict[str, Any]],
         model: str
     ) -> Dict[str, Any]:
         """Generate response using Emergent LLM"""
         try:
             payload = {
                 "model": model,
-                "messages": [{"role": "system", "content": system_prompt}] + messages,
+                "messages": [{"role": "system", "content": self._flatten_system_prompt(system_prompt)}] + messages,
                 "tools": self._get_available_tools()
             }
             
             response = await self.emergent_client.post("/chat/completions", json=payload)
             response.raise_for_status()
-            
-            data = response.json()
+
+            data = orjson.loads(response.content)
             message = data["choices"][0]["message"]
             
             return {
                 "content": message.get("content", ""),
-                "role": MessageRole.ASSISTANT,
+                "role": _ROLE_ASSISTANT,
                 "tool_calls": message.get("tool_calls", []),
                 "model": model,
                 "usage": data.get("usage")
@@ -177,51 +386,330 @@ class AIService:
     
     def _get_model_params(self, thinking_mode: ThinkingMode) -> Dict[str, Any]:
         """Get model parameters based on thinking mode"""
-        params = {
-            ThinkingMode.QUICK: {
-                "temperature": 0.3,
-                "max_tokens": 512
-            },
-            ThinkingMode.MEDIUM: {
-                "temperature": 0.7,
-                "max_tokens": 1024
+        return _MODEL_PARAMS.get(thinking_mode, _MODEL_PARAMS[ThinkingMode.MEDIUM])
+    
+    async def process_message_stream(
+        self,
+        user_id: str,
+        conversation_id: str,
+        message_content: str,
+        thinking_mode: ThinkingMode = ThinkingMode.MEDIUM,
+        model: str = "gpt-4",
+        user_message_id: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream the assistant response token by token.
+
+        Perceived latency drops to time-to-first-token; the full text is
+        accumulated and persisted through the usual save path once the
+        stream ends. Tool-call-heavy turns should keep using
+        process_message, which resolves tool calls before responding.
+        """
+        context, active_integrations, messages = await asyncio.gather(
+            self._get_conversation_context(conversation_id),
+            self._get_user_integrations(user_id),
+            self._prepare_messages(conversation_id, message_content, {})
+        )
+        system_prompt = self._build_system_prompt(active_integrations, thinking_mode)
+
+        parts: List[str] = []
+        async for token in self._dispatch_generate_stream(messages, system_prompt, model, thinking_mode):
+            parts.append(token)
+            yield token
+
+        self._save_messages_background(
+            user_id, conversation_id, message_content,
+            {
+                "content": "".join(parts),
+                "role": _ROLE_ASSISTANT,
+                "tool_calls": [],
+                "model": model,
+                "usage": None
             },
-            ThinkingMode.DEEP: {
-                "temperature": 0.9,
-                "max_tokens": 2048
+            user_message_id=user_message_id
+        )
+
+    async def _dispatch_generate_stream(
+        self,
+        messages: List[Dict],
+        system_prompt: List[Dict[str, Any]],
+        model: str,
+        thinking_mode: ThinkingMode
+    ) -> AsyncGenerator[str, None]:
+        """Route a streaming completion to the right provider client"""
+        model_params = self._get_model_params(thinking_mode)
+
+        if model.startswith("gpt-") and self.openai_client:
+            full_messages = [{"role": "system", "content": self._flatten_system_prompt(system_prompt)}] + messages
+            stream = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=full_messages,
+                stream=True,
+                **model_params
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        elif model.startswith("claude-") and self.anthropic_client:
+            async with self.anthropic_client.messages.stream(
+                model=model,
+                system=self._flatten_system_prompt(system_prompt),
+                messages=messages,
+                max_tokens=model_params["max_tokens"]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+        elif self.emergent_client:
+            payload = {
+                "model": model,
+                "messages": [{"role": "system", "content": self._flatten_system_prompt(system_prompt)}] + messages,
+                "stream": True
             }
-        }
-        return params.get(thinking_mode, params[ThinkingMode.MEDIUM])
-    
-    def _build_system_prompt(self, integrations: List[Dict], thinking_mode: ThinkingMode) -> str:
-        """Build system prompt based on user's integrations"""
-        base_prompt = """You are Loki, an AI productivity assistant that helps users accomplish tasks across multiple integrated tools and platforms.
+            async with self.emergent_client.stream("POST", "/chat/completions", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: ") or line == "data: [DONE]":
+                        continue
+                    chunk = orjson.loads(line[len("data: "):])
+                    delta = chunk["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        else:
+            raise Exception("No AI client available")
 
-Your capabilities include:
-- Analyzing and processing information across connected services
-- Executing actions in integrated tools (Slack, Google Workspace, GitHub, etc.)
-- Creating workflows and automations
-- Providing insights and recommendations
+    async def _dispatch_generate(
+        self,
+        messages: List[Dict],
+        system_prompt: List[Dict[str, Any]],
+        model: str,
+        thinking_mode: ThinkingMode
+    ) -> Dict[str, Any]:
+        """Route a completion to the right provider client"""
+        if model.startswith("gpt-") and self.openai_client:
+            return await self._generate_openai_response(messages, system_prompt, model, thinking_mode)
+        elif model.startswith("claude-") and self.anthropic_client:
+            return await self._generate_anthropic_response(messages, system_prompt, model)
+        elif self.emergent_client:
+            return await self._generate_emergent_response(messages, system_prompt, model)
+        raise Exception("No AI client available")
+
+    async def _generate_coalesced(
+        self,
+        key: str,
+        messages: List[Dict],
+        system_prompt: List[Dict[str, Any]],
+        model: str,
+        thinking_mode: ThinkingMode
+    ) -> Dict[str, Any]:
+        """Coalesce concurrent identical requests onto one upstream call.
+
+        The first arrival owns the provider call; later arrivals with the
+        same key await its future for as long as the call is in flight, so
+        an N-way burst (FAQ storms, fan-out workflows) costs one request.
+        """
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._dispatch_generate(messages, system_prompt, model, thinking_mode)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # Consume the exception if nobody subscribed
+                future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    async def process_message_batch(self, requests: List[Dict[str, Any]]) -> str:
+        """Submit non-interactive messages through a provider batch API.
+
+        Batched completions (daily summaries, workflow backfills) cost half
+        the real-time token price and tolerate hours of latency. Each
+        request dict carries user_id, conversation_id, message_content, and
+        optionally thinking_mode/model; results are persisted by
+        poll_batches once the provider reports completion.
+        """
+        if not requests:
+            raise Exception("Empty batch")
+
+        db = self._get_db()
+        entries = []
+        for i, req in enumerate(requests):
+            thinking_mode = ThinkingMode(req.get("thinking_mode", ThinkingMode.MEDIUM))
+            context, integrations, messages = await asyncio.gather(
+                self._get_conversation_context(req["conversation_id"]),
+                self._get_user_integrations(req["user_id"]),
+                self._prepare_messages(req["conversation_id"], req["message_content"], {})
+            )
+            system_prompt = self._build_system_prompt(integrations, thinking_mode)
+            entries.append({
+                "custom_id": f"req_{i}",
+                "request": req,
+                "system_prompt": system_prompt,
+                "messages": messages,
+                "params": self._get_model_params(thinking_mode)
+            })
+
+        if self.anthropic_client:
+            batch = await self.anthropic_client.messages.batches.create(requests=[
+                {
+                    "custom_id": e["custom_id"],
+                    "params": {
+                        "model": e["request"].get("model", "claude-3-haiku-20240307"),
+                        "system": self._flatten_system_prompt(e["system_prompt"]),
+                        "messages": e["messages"],
+                        "max_tokens": e["params"]["max_tokens"]
+                    }
+                }
+                for e in entries
+            ])
+            provider, batch_id = "anthropic", batch.id
+        elif self.openai_client:
+            import io
+            jsonl = b"\n".join(
+                orjson.dumps({
+                    "custom_id": e["custom_id"],
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": e["request"].get("model", "gpt-4"),
+                        "messages": [{"role": "system", "content": self._flatten_system_prompt(e["system_prompt"])}] + e["messages"],
+                        **e["params"]
+                    }
+                })
+                for e in entries
+            )
+            batch_file = await self.openai_client.files.create(
+                file=io.BytesIO(jsonl), purpose="batch"
+            )
+            batch = await self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            provider, batch_id = "openai", batch.id
+        else:
+            raise Exception("No batch-capable AI client available")
+
+        await db.ai_batches.insert_one({
+            "id": batch_id,
+            "provider": provider,
+            "status": "submitted",
+            "requests": {e["custom_id"]: e["request"] for e in entries},
+            "created_at": datetime.utcnow()
+        })
+        return batch_id
+
+    async def poll_batches(self) -> int:
+        """Collect finished provider batches and persist their messages"""
+        db = self._get_db()
+        completed = 0
+        pending = await db.ai_batches.find({"status": "submitted"}).to_list(100)
+
+        for batch_doc in pending:
+            results = None
+            if batch_doc["provider"] == "anthropic" and self.anthropic_client:
+                batch = await self.anthropic_client.messages.batches.retrieve(batch_doc["id"])
+                if batch.processing_status != "ended":
+                    continue
+                results = [
+                    (r.custom_id, {
+                        "content": r.result.message.content[0].text if r.result.message.content else "",
+                        "role": _ROLE_ASSISTANT,
+                        "tool_calls": [],
+                        "model": r.result.message.model,
+                        "usage": None
+                    })
+                    async for r in await self.anthropic_client.messages.batches.results(batch_doc["id"])
+                    if r.result.type == "succeeded"
+                ]
+            elif batch_doc["provider"] == "openai" and self.openai_client:
+                batch = await self.openai_client.batches.retrieve(batch_doc["id"])
+                if batch.status != "completed":
+                    continue
+                content = await self.openai_client.files.content(batch.output_file_id)
+                results = []
+                for line in content.content.splitlines():
+                    if not line:
+                        continue
+                    row = orjson.loads(line)
+                    message = row["response"]["body"]["choices"][0]["message"]
+                    results.append((row["custom_id"], {
+                        "content": message.get("content"),
+                        "role": _ROLE_ASSISTANT,
+                        "tool_calls": message.get("tool_calls") or [],
+                        "model": row["response"]["body"].get("model"),
+                        "usage": row["response"]["body"].get("usage")
+                    }))
+
+            if results is None:
+                continue
+
+            for custom_id, response in results:
+                req = batch_doc["requests"].get(custom_id)
+                if req:
+                    await self._save_messages(
+                        req["user_id"], req["conversation_id"],
+                        req["message_content"], response
+                    )
+
+            await db.ai_batches.update_one(
+                {"id": batch_doc["id"]},
+                {"$set": {"status": "completed", "completed_at": datetime.utcnow()}}
+            )
+            completed += 1
+
+        return completed
+
+    def _build_system_prompt(self, integrations: List[Dict], thinking_mode: ThinkingMode) -> List[Dict[str, Any]]:
+        """Build the system prompt as ordered blocks.
+
+        Blocks are ordered from most to least stable — static base, then the
+        per-user integrations block, then the volatile thinking-mode line —
+        so provider-side prompt caching covers the largest possible prefix.
+        Each block carries a "cache" flag the Anthropic path translates into
+        cache_control markers; the other providers get the joined text with
+        the stable prefix first, which OpenAI's automatic prefix caching
+        picks up on its own.
+        """
+        blocks = [_BASE_BLOCK]
 
-"""
-        
         if integrations:
-            integration_names = [integration["integration_type"] for integration in integrations]
-            base_prompt += f"\nYou currently have access to these integrations: {', '.join(integration_names)}\n"
-            base_prompt += "You can perform actions in these tools when requested by the user.\n"
-        
-        thinking_mode_prompts = {
-            ThinkingMode.QUICK: "Provide quick, concise responses. Focus on efficiency.",
-            ThinkingMode.MEDIUM: "Provide balanced responses with sufficient detail and reasoning.",
-            ThinkingMode.DEEP: "Provide thorough, comprehensive responses with detailed analysis and reasoning."
-        }
-        
-        base_prompt += f"\nThinking mode: {thinking_mode_prompts[thinking_mode]}\n"
-        
-        return base_prompt
+            # Sorted so identical integration sets produce identical blocks
+            integration_names = sorted(
+                integration["integration_type"] for integration in integrations
+            )
+            blocks.append({
+                "text": (
+                    f"\nYou currently have access to these integrations: {', '.join(integration_names)}\n"
+                    "You can perform actions in these tools when requested by the user.\n"
+                ),
+                "cache": True
+            })
+
+        blocks.append(_MODE_BLOCKS.get(thinking_mode, _MODE_BLOCKS[ThinkingMode.MEDIUM]))
+
+        return blocks
+
+    @staticmethod
+    def _flatten_system_prompt(blocks: List[Dict[str, Any]]) -> str:
+        """Join prompt blocks for providers that take a single string"""
+        return "".join(block["text"] for block in blocks)
     
     def _get_available_tools(self) -> List[Dict[str, Any]]:
         """Get available tools based on integrations"""
+        return self._tools
+
+    @staticmethod
+    def _build_tools() -> List[Dict[str, Any]]:
+        """Build the static tool schema once at init"""
         tools = [
             {
                 "type": "function",
@@ -274,52 +762,93 @@ Your capabilities include:
         
         return tools
     
+    async def _execute_single_tool_call(self, user_id: str, tool_call: Dict) -> Dict[str, Any]:
+        """Execute one tool call"""
+        function_name = tool_call["function"]["name"]
+        parameters = orjson.loads(tool_call["function"]["arguments"])
+
+        if function_name == "execute_integration_action":
+            return await integration_service.execute_action(
+                user_id,
+                parameters["integration_type"],
+                parameters["action"],
+                parameters["parameters"]
+            )
+        elif function_name == "create_workflow":
+            # This would integrate with workflow service
+            return {"status": "workflow_created", "id": "workflow_123"}
+        return {"error": f"Unknown function: {function_name}"}
+
     async def _execute_tool_calls(self, user_id: str, tool_calls: List[Dict]) -> List[Dict]:
-        """Execute tool calls and return results"""
+        """Execute tool calls concurrently and return results in call order"""
+        # The calls are independent network requests; gather collapses
+        # latency from sum-of-calls to max-of-calls
+        raw_results = await asyncio.gather(
+            *(self._execute_single_tool_call(user_id, tool_call) for tool_call in tool_calls),
+            return_exceptions=True
+        )
+
         results = []
-        
-        for tool_call in tool_calls:
-            function_name = tool_call["function"]["name"]
-            parameters = json.loads(tool_call["function"]["arguments"])
-            
-            try:
-                if function_name == "execute_integration_action":
-                    result = await integration_service.execute_action(
-                        user_id,
-                        parameters["integration_type"],
-                        parameters["action"],
-                        parameters["parameters"]
-                    )
-                elif function_name == "create_workflow":
-                    # This would integrate with workflow service
-                    result = {"status": "workflow_created", "id": "workflow_123"}
-                else:
-                    result = {"error": f"Unknown function: {function_name}"}
-                
+        for tool_call, result in zip(tool_calls, raw_results):
+            if isinstance(result, Exception):
                 results.append({
                     "tool_call_id": tool_call["id"],
-                    "result": result
+                    "error": str(result)
                 })
-            except Exception as e:
+            else:
                 results.append({
                     "tool_call_id": tool_call["id"],
-                    "error": str(e)
+                    "result": result
                 })
-        
         return results
     
     async def _get_conversation_context(self, conversation_id: str) -> Dict[str, Any]:
         """Get conversation context"""
+        context = self._ctx_cache.get(conversation_id)
+        if context is not None:
+            return context
         conversation = await self.db.conversations.find_one({"id": conversation_id})
-        return conversation.get("context", {}) if conversation else {}
-    
+        context = conversation.get("context", {}) if conversation else {}
+        self._ctx_cache[conversation_id] = context
+        return context
+
     async def _get_user_integrations(self, user_id: str) -> List[Dict]:
         """Get user's active integrations"""
+        integrations = self._int_cache.get(user_id)
+        if integrations is not None:
+            return integrations
         integrations = await self.db.integrations.find({
             "user_id": user_id,
             "status": "active"
         }).to_list(100)
+        self._int_cache[user_id] = integrations
         return integrations
+
+    def start_cache_invalidator(self):
+        """Subscribe to integration-write invalidations (called at startup)"""
+        if not self._invalidator_task:
+            self._invalidator_task = asyncio.create_task(self._listen_invalidations())
+
+    async def stop_cache_invalidator(self):
+        """Stop the invalidation listener (called at shutdown)"""
+        if self._invalidator_task:
+            self._invalidator_task.cancel()
+            try:
+                await self._invalidator_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidator_task = None
+
+    async def _listen_invalidations(self):
+        """Drop cached integration lists when a write is published"""
+        pubsub = get_redis().pubsub()
+        await pubsub.subscribe("integrations:invalidate")
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self._int_cache.pop(message["data"].decode(), None)
+        finally:
+            await pubsub.aclose()
     
     async def _prepare_messages(
         self, 
@@ -328,49 +857,108 @@ Your capabilities include:
         context: Dict
     ) -> List[Dict]:
         """Prepare message history for AI"""
-        # Get recent messages from conversation
+        # Latest window via the (conversation_id, created_at DESC) index,
+        # with only the two fields the prompt needs — tool_calls/
+        # tool_results/metadata can be many KB per message and never reach
+        # the LLM
         messages = await self.db.messages.find(
-            {"conversation_id": conversation_id}
-        ).sort("created_at", 1).limit(20).to_list(20)
-        
-        formatted_messages = []
-        for msg in messages:
-            formatted_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-        
+            {"conversation_id": conversation_id},
+            {"role": 1, "content": 1, "_id": 0}
+        ).sort("created_at", -1).limit(self._HISTORY_FETCH).to_list(self._HISTORY_FETCH)
+
+        # Reverse back into chronological order
+        history = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in reversed(messages)
+        ]
+
+        if len(history) > self._HISTORY_HEAD + self._HISTORY_TAIL:
+            history = await self._compact_history(history)
+
         # Add new user message
-        formatted_messages.append({
+        history.append({
             "role": "user",
             "content": new_message
         })
-        
-        return formatted_messages
+
+        return history
+
+    # History shaping: the head stays verbatim forever (cache-stable
+    # prefix), the tail stays verbatim for recency, and the middle folds
+    # into a digest that only changes once per SUMMARY_BLOCK turns so the
+    # cacheable prefix survives the rolling window.
+    _HISTORY_FETCH = 200
+    _HISTORY_HEAD = 4
+    _HISTORY_TAIL = 8
+    _SUMMARY_BLOCK = 10
+
+    async def _compact_history(self, history: List[Dict]) -> List[Dict]:
+        """Fold the middle of a long history into a stable digest message"""
+        head = history[:self._HISTORY_HEAD]
+        tail = history[-self._HISTORY_TAIL:]
+        middle = history[self._HISTORY_HEAD:-self._HISTORY_TAIL]
+
+        # Only whole blocks are digested; the remainder rides along
+        # verbatim so the digest text is identical for BLOCK turns in a row
+        cut = (len(middle) // self._SUMMARY_BLOCK) * self._SUMMARY_BLOCK
+        digested, carry = middle[:cut], middle[cut:]
+        if not digested:
+            return history
+
+        digest_key = "chatdigest:" + hashlib.sha256(
+            orjson.dumps(digested)
+        ).hexdigest()
+        digest = None
+        try:
+            digest = await cache_get(digest_key)
+        except Exception:
+            pass
+
+        if digest is None:
+            lines = [
+                f"- {msg['role']}: {(msg['content'] or '')[:100]}"
+                for msg in digested[-40:]
+            ]
+            digest = (
+                f"[Summary of {len(digested)} earlier messages]\n" + "\n".join(lines)
+            )
+            try:
+                await cache_set(digest_key, digest, expire=86400)
+            except Exception:
+                pass
+
+        return head + [{"role": "assistant", "content": digest}] + carry + tail
     
     async def _save_messages(
-        self, 
-        conversation_id: str, 
-        user_message: str, 
-        ai_response: Dict
+        self,
+        user_id: str,
+        conversation_id: str,
+        user_message: str,
+        ai_response: Dict,
+        user_message_id: Optional[str] = None
     ):
         """Save messages to database"""
-        # Save user message
+        now = datetime.utcnow()
+
+        # Save user message (user_id is denormalized onto messages so chat
+        # reads can verify ownership without a conversations lookup)
         user_msg = {
-            "id": f"msg_{datetime.utcnow().timestamp()}",
+            "id": f"msg_{now.timestamp()}",
             "conversation_id": conversation_id,
-            "role": MessageRole.USER,
+            "user_id": user_id,
+            "role": _ROLE_USER,
             "content": user_message,
             "tool_calls": [],
             "tool_results": [],
             "metadata": {},
-            "created_at": datetime.utcnow()
+            "created_at": now
         }
-        
+
         # Save AI response
         ai_msg = {
-            "id": f"msg_{datetime.utcnow().timestamp()}_ai",
+            "id": f"msg_{now.timestamp()}_ai",
             "conversation_id": conversation_id,
+            "user_id": user_id,
             "role": ai_response["role"],
             "content": ai_response["content"],
             "tool_calls": ai_response.get("tool_calls", []),
@@ -379,15 +967,41 @@ Your capabilities include:
                 "model": ai_response.get("model"),
                 "usage": ai_response.get("usage")
             },
-            "created_at": datetime.utcnow()
+            "created_at": now
         }
-        
-        await self.db.messages.insert_many([user_msg, ai_msg])
-        
-        # Update conversation last activity
-        await self.db.conversations.update_one(
-            {"id": conversation_id},
-            {"$set": {"last_activity": datetime.utcnow()}}
+
+        if user_message_id:
+            # User message already persisted by the caller; clear the
+            # pending marker and store only the assistant reply
+            message_writes = [
+                self.db.messages.update_one(
+                    {"id": user_message_id},
+                    {"$set": {"metadata": {}}}
+                ),
+                self.db.messages.insert_one(ai_msg)
+            ]
+        else:
+            message_writes = [self.db.messages.insert_many([user_msg, ai_msg], ordered=False)]
+
+        # The message writes and the last-activity bump are independent;
+        # issue them together instead of three sequential round trips
+        await asyncio.gather(
+            *message_writes,
+            self.db.conversations.update_one(
+                {"id": conversation_id},
+                {"$set": {"last_activity": now}}
+            )
         )
 
+    def _save_messages_background(self, *args, **kwargs):
+        """Persist messages without blocking the response path"""
+        task = asyncio.get_running_loop().create_task(self._save_messages(*args, **kwargs))
+        self._save_tasks.add(task)
+        task.add_done_callback(self._on_save_done)
+
+    def _on_save_done(self, task: asyncio.Task):
+        self._save_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Message save error: {task.exception()}")
+
 ai_service = AIService()
\ No newline at end of file
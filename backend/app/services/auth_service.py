@@ -1,16 +1,49 @@
+import asyncio
 from typing import Optional, Tuple
 from datetime import datetime, timedelta
+from cachetools import TTLCache
 from fastapi import HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.core.security import create_password_hash, verify_password, create_access_token, create_refresh_token, verify_token, generate_uuid
+from app.core.config import settings
+from app.core.security import acreate_password_hash, averify_password, password_needs_rehash, create_access_token, create_refresh_token, verify_token, invalidate_token
 from app.models.user import User, UserCreate, UserResponse, Team, TeamCreate, UserRole
 from app.db.mongodb import get_database
 from app.db.redis import store_session, get_session, delete_session
 
+# Auth lookups fetch only the fields the path needs; the rest of the
+# user document (profile blobs, settings history) never leaves BSON
+_LOGIN_PROJECTION = {
+    "id": 1, "email": 1, "hashed_password": 1, "full_name": 1,
+    "avatar_url": 1, "is_active": 1, "is_verified": 1, "team_id": 1,
+    "role": 1, "settings": 1, "created_at": 1, "last_login": 1, "_id": 0
+}
+_CURRENT_USER_PROJECTION = {k: 1 for k in _LOGIN_PROJECTION if k != "hashed_password"}
+_CURRENT_USER_PROJECTION["_id"] = 0
+_REFRESH_PROJECTION = {
+    "id": 1, "email": 1, "hashed_password": 1, "is_active": 1,
+    "team_id": 1, "role": 1, "_id": 0
+}
+
 class AuthService:
     def __init__(self):
         self.db = None
+        # Stateless refresh rotation: users validated within the last few
+        # seconds skip the DB lookup, and rotated/revoked jtis are rejected
+        # without any round trip
+        self._refresh_user_cache = TTLCache(maxsize=10_000, ttl=5)
+        self._revoked_jtis = TTLCache(
+            maxsize=100_000,
+            ttl=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        )
+        # Strong refs to fire-and-forget session writes so they are not GC'd
+        self._session_tasks: set = set()
+        # token → UserResponse for get_current_user: the same access token
+        # arrives hundreds of times over its lifetime, and the signature
+        # check alone is enough once the user has been resolved. The
+        # reverse index lets logout evict every live token for a user.
+        self._user_cache = TTLCache(maxsize=50_000, ttl=300)
+        self._user_tokens = TTLCache(maxsize=50_000, ttl=300)
     
     def _get_db(self):
         if not self.db:
@@ -28,120 +61,166 @@ class AuthService:
                 detail="User with this email already exists"
             )
         
-        # Create team first
-        team = Team(
-            name=f"{user_data.full_name or 'Personal'} Team",
-            owner_id=generate_uuid()  # Temporary, will update after user creation
-        )
-        
-        # Create user
+        # Create user first so the team can be built with its real owner
         user = User(
             email=user_data.email,
-            hashed_password=create_password_hash(user_data.password),
+            hashed_password=await acreate_password_hash(user_data.password),
             full_name=user_data.full_name,
-            team_id=team.id,
             role=UserRole.ADMIN
         )
-        
-        # Update team owner_id
-        team.owner_id = user.id
-        
-        # Insert both documents
-        await db.teams.insert_one(team.dict())
-        await db.users.insert_one(user.dict())
-        
+        team = Team(
+            name=f"{user_data.full_name or 'Personal'} Team",
+            owner_id=user.id
+        )
+        user.team_id = team.id
+
+        # Dump each model once and reuse the dict for both the insert and
+        # the response; the data was validated at construction, so the
+        # response skips revalidation
+        user_doc = user.model_dump()
+        team_doc = team.model_dump()
+
+        # Insert both documents concurrently
+        await asyncio.gather(
+            db.teams.insert_one(team_doc),
+            db.users.insert_one(user_doc)
+        )
+
         # Generate tokens
         tokens = await self._generate_user_tokens(user)
-        
-        return UserResponse(**user.dict()), tokens
+
+        return UserResponse.model_construct(**user_doc), tokens
     
     async def authenticate_user(self, email: str, password: str) -> Tuple[UserResponse, dict]:
         """Authenticate user and return tokens"""
         db = self._get_db()
-        user_doc = await db.users.find_one({"email": email})
+        user_doc = await db.users.find_one({"email": email}, _LOGIN_PROJECTION)
         if not user_doc:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
         
-        user = User(**user_doc)
-        
+        # Trusted DB-sourced data: skip revalidation
+        user = User.model_construct(**user_doc)
+
         if not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Account is deactivated"
             )
-        
-        if not verify_password(password, user.hashed_password):
+
+        if not await averify_password(password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
-        
-        # Update last login
+
+        # Update last login, upgrading legacy/stale hashes while we hold
+        # the plaintext
+        login_update = {"last_login": datetime.utcnow()}
+        if password_needs_rehash(user.hashed_password):
+            login_update["hashed_password"] = await acreate_password_hash(password)
+
         await db.users.update_one(
             {"id": user.id},
-            {"$set": {"last_login": datetime.utcnow()}}
+            {"$set": login_update}
         )
         user.last_login = datetime.utcnow()
-        
+
         # Generate tokens
         tokens = await self._generate_user_tokens(user)
-        
-        return UserResponse(**user.dict()), tokens
+
+        user_doc["last_login"] = user.last_login
+        return UserResponse.model_construct(**user_doc), tokens
     
     async def refresh_token(self, refresh_token: str) -> dict:
-        """Refresh access token"""
+        """Refresh access token, rotating the refresh token's jti"""
         payload = verify_token(refresh_token, "refresh")
         user_id = payload.get("sub")
-        
-        db = self._get_db()
-        user_doc = await db.users.find_one({"id": user_id})
-        if not user_doc:
+        jti = payload.get("jti")
+
+        if jti and jti in self._revoked_jtis:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
+                detail="Refresh token revoked"
             )
-        
-        user = User(**user_doc)
+
+        user = self._refresh_user_cache.get(user_id)
+        if user is None:
+            db = self._get_db()
+            user_doc = await db.users.find_one({"id": user_id}, _REFRESH_PROJECTION)
+            if not user_doc:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            # Trusted DB-sourced data: skip revalidation
+            user = User.model_construct(**user_doc)
+            self._refresh_user_cache[user_id] = user
+
+        # Rotation: the presented token may not be replayed
+        if jti:
+            self._revoked_jtis[jti] = True
+
         return await self._generate_user_tokens(user)
     
     async def get_current_user(self, access_token: str) -> UserResponse:
         """Get current user from access token"""
+        # Signature/expiry always verified; only the DB lookup is cached
         payload = verify_token(access_token, "access")
+
+        cached = self._user_cache.get(access_token)
+        if cached is not None:
+            return cached
+
         user_id = payload.get("sub")
-        
+
         db = self._get_db()
-        user_doc = await db.users.find_one({"id": user_id})
+        user_doc = await db.users.find_one({"id": user_id}, _CURRENT_USER_PROJECTION)
         if not user_doc:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
-        
-        user = User(**user_doc)
-        if not user.is_active:
+
+        if not user_doc.get("is_active"):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Account is deactivated"
             )
-        
-        return UserResponse(**user.dict())
+
+        # The projection matches UserResponse exactly; no intermediate
+        # User model is materialized and no revalidation runs
+        response = UserResponse.model_construct(**user_doc)
+        self._user_cache[access_token] = response
+        self._user_tokens.setdefault(user_id, set()).add(access_token)
+        return response
     
     async def _generate_user_tokens(self, user: User) -> dict:
         """Generate access and refresh tokens"""
-        access_token = create_access_token({"sub": user.id, "email": user.email})
+        # Authorization claims ride in the token so most endpoints can
+        # resolve the user without a DB lookup (see deps.get_current_user)
+        access_token = create_access_token({
+            "sub": user.id,
+            "email": user.email,
+            "is_active": user.is_active,
+            "role": user.role,
+            "team_id": user.team_id
+        })
         refresh_token = create_refresh_token({"sub": user.id})
         
-        # Store session
+        # Store session off the response path — nothing below reads it,
+        # so the Redis round trip should not delay the token response
         session_data = {
             "user_id": user.id,
             "team_id": user.team_id,
             "role": user.role,
             "created_at": datetime.utcnow().isoformat()
         }
-        await store_session(user.id, session_data)
+        task = asyncio.create_task(store_session(user.id, session_data))
+        self._session_tasks.add(task)
+        task.add_done_callback(self._session_tasks.discard)
         
         return {
             "access_token": access_token,
@@ -150,14 +229,26 @@ class AuthService:
             "expires_in": 1800  # 30 minutes
         }
     
-    async def logout_user(self, user_id: str):
-        """Logout user by clearing session"""
+    async def logout_user(self, user_id: str, refresh_token: Optional[str] = None):
+        """Logout user by clearing session and revoking their refresh token"""
         await delete_session(user_id)
+        self._refresh_user_cache.pop(user_id, None)
+        for token in self._user_tokens.pop(user_id, ()):
+            self._user_cache.pop(token, None)
+        if refresh_token:
+            invalidate_token(refresh_token)
+            try:
+                payload = verify_token(refresh_token, "refresh")
+            except HTTPException:
+                return
+            jti = payload.get("jti")
+            if jti:
+                self._revoked_jtis[jti] = True
     
     async def get_user_team(self, user_id: str) -> Optional[dict]:
         """Get user's team information"""
         db = self._get_db()
-        user_doc = await db.users.find_one({"id": user_id})
+        user_doc = await db.users.find_one({"id": user_id}, {"team_id": 1, "_id": 0})
         if not user_doc or not user_doc.get("team_id"):
             return None
         
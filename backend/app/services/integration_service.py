@@ -1,20 +1,155 @@
-import json
+import asyncio
 import secrets
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from cachetools import TTLCache
 from typing import Dict, List, Any, Optional
 import httpx
-from urllib.parse import urlencode
+import orjson
+from urllib.parse import quote
 
 from app.core.config import settings
-from app.models.integration import Integration, IntegrationType, IntegrationStatus, OAuthState, INTEGRATION_CONFIGS
+from app.models.integration import Integration, IntegrationType, IntegrationStatus, INTEGRATION_CONFIGS
 from app.db.mongodb import get_database
-from app.core.security import encrypt_oauth_token, decrypt_oauth_token
+from app.db.redis import put_oauth_state, pop_oauth_state, get_redis
+from app.core.security import decrypt_oauth_token, aencrypt_oauth_token
+
+# Ciphertext → plaintext memo for token decryption: decryption is
+# deterministic, and a rotated token yields a new ciphertext, so stale
+# entries are never hit and simply age out of the LRU
+_decrypt_cached = lru_cache(maxsize=4096)(decrypt_oauth_token)
+
+# OAuth endpoint tables, built once at import: settings are frozen, so
+# per-call reconstruction only re-allocated identical dicts. MappingProxyType
+# keeps them read-only.
+_OAUTH_URL_CONFIGS = MappingProxyType({
+    IntegrationType.SLACK: {
+        "base_url": "https://slack.com/oauth/v2/authorize",
+        "client_id": settings.SLACK_CLIENT_ID,
+        "scopes": "channels:read,chat:write,users:read,im:read,im:write"
+    },
+    IntegrationType.GOOGLE: {
+        "base_url": "https://accounts.google.com/o/oauth2/v2/auth",
+        "client_id": settings.GOOGLE_CLIENT_ID,
+        "scopes": "https://www.googleapis.com/auth/gmail.modify https://www.googleapis.com/auth/calendar https://www.googleapis.com/auth/drive"
+    },
+    IntegrationType.GITHUB: {
+        "base_url": "https://github.com/login/oauth/authorize",
+        "client_id": settings.GITHUB_CLIENT_ID,
+        "scopes": "repo,user,write:discussion"
+    },
+    IntegrationType.NOTION: {
+        "base_url": "https://api.notion.com/v1/oauth/authorize",
+        "client_id": settings.NOTION_CLIENT_ID,
+        "scopes": "read_content,update_content,insert_content"
+    }
+})
+
+_TOKEN_ENDPOINTS = MappingProxyType({
+    IntegrationType.SLACK: {
+        "url": "https://slack.com/api/oauth.v2.access",
+        "client_id": settings.SLACK_CLIENT_ID,
+        "client_secret": settings.SLACK_CLIENT_SECRET
+    },
+    IntegrationType.GOOGLE: {
+        "url": "https://oauth2.googleapis.com/token",
+        "client_id": settings.GOOGLE_CLIENT_ID,
+        "client_secret": settings.GOOGLE_CLIENT_SECRET
+    },
+    IntegrationType.GITHUB: {
+        "url": "https://github.com/login/oauth/access_token",
+        "client_id": settings.GITHUB_CLIENT_ID,
+        "client_secret": settings.GITHUB_CLIENT_SECRET
+    }
+})
+
+# Static authorize-URL prefixes, percent-encoded once: only redirect_uri
+# and state vary per request, and the long scope strings dominate the
+# encoding cost
+_OAUTH_PREFIXES = MappingProxyType({
+    t: (
+        f"{cfg['base_url']}?client_id={quote(cfg['client_id'] or '', safe='')}"
+        f"&response_type=code&scope={quote(cfg['scopes'], safe='')}"
+    )
+    for t, cfg in _OAUTH_URL_CONFIGS.items()
+})
+
+# User-info URLs only; the Authorization header carries a per-call token
+_USER_INFO_URLS = MappingProxyType({
+    IntegrationType.SLACK: "https://slack.com/api/auth.test",
+    IntegrationType.GOOGLE: "https://www.googleapis.com/oauth2/v2/userinfo",
+    IntegrationType.GITHUB: "https://api.github.com/user"
+})
+
+class _TokenBucket:
+    """Minimal async token bucket for outbound provider calls.
+
+    Tokens accrue at `rate` per second up to `burst`; acquire() debits one
+    and, when the bucket runs dry, sleeps exactly long enough for the debt
+    to clear. Staying under each provider's cap is cheaper than eating a
+    429 and redoing the request.
+    """
+    __slots__ = ("rate", "burst", "_tokens", "_updated", "_lock")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Debit first; a negative balance is queued work and maps
+            # directly to how long this caller must wait
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+# Published provider caps, expressed as tokens/second with a small burst
+# allowance: Slack Web API ~50/min (tier 3), GitHub REST 5000/hour,
+# Google Workspace comfortably above both
+_PROVIDER_RATES = MappingProxyType({
+    IntegrationType.SLACK: (50 / 60, 10),
+    IntegrationType.GITHUB: (5000 / 3600, 20),
+    IntegrationType.GOOGLE: (10.0, 20),
+    IntegrationType.NOTION: (3.0, 5)
+})
 
 class IntegrationService:
     def __init__(self):
         self.db = None
-        self.http_client = httpx.AsyncClient()
-    
+        # Keep-alive pool with HTTP/2: OAuth exchanges and action calls hit
+        # the same few hosts, so handshakes amortize across requests
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30
+            ),
+            timeout=httpx.Timeout(30.0, connect=10.0)
+        )
+        # Decrypted action tokens keyed by (user_id, integration_type
+        # value); repeat workflow steps skip the Mongo read and decrypt
+        self._action_cache = TTLCache(maxsize=10_000, ttl=60)
+        # One bucket per provider so a workflow burst queues locally
+        # instead of bouncing off the provider's rate limiter
+        self._rate_limits = {
+            t: _TokenBucket(rate, burst)
+            for t, (rate, burst) in _PROVIDER_RATES.items()
+        }
+
+    async def close(self):
+        """Close the shared HTTP client (called at app shutdown)"""
+        await self.http_client.aclose()
+
     def _get_db(self):
         if not self.db:
             self.db = get_database()
@@ -22,14 +157,24 @@ class IntegrationService:
     
     async def get_user_integrations(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all integrations for a user"""
-        integrations = await self.db.integrations.find({"user_id": user_id}).to_list(100)
-        
-        # Remove sensitive data
-        for integration in integrations:
-            integration.pop("access_token", None)
-            integration.pop("refresh_token", None)
-        
-        return integrations
+        # Project only the response fields: OAuth tokens never leave the
+        # server and the documents come back as small as the API needs
+        projection = {
+            "_id": 0,
+            "id": 1,
+            "integration_type": 1,
+            "name": 1,
+            "status": 1,
+            "settings": 1,
+            "scopes": 1,
+            "external_user_id": 1,
+            "last_sync": 1,
+            "sync_enabled": 1,
+            "created_at": 1
+        }
+        return await self.db.integrations.find(
+            {"user_id": user_id}, projection
+        ).to_list(100)
     
     async def initiate_oauth(self, user_id: str, integration_type: IntegrationType, redirect_uri: str) -> str:
         """Initiate OAuth flow for integration"""
@@ -39,17 +184,14 @@ class IntegrationService:
         
         # Generate state parameter
         state = secrets.token_urlsafe(32)
-        
-        # Store OAuth state
-        oauth_state = OAuthState(
-            user_id=user_id,
-            integration_type=integration_type,
-            state=state,
-            redirect_uri=redirect_uri,
-            expires_at=datetime.utcnow() + timedelta(minutes=10)
-        )
-        await self.db.oauth_states.insert_one(oauth_state.dict())
-        
+
+        # Store OAuth state in Redis; it expires on its own after 10 minutes
+        await put_oauth_state(state, {
+            "user_id": user_id,
+            "integration_type": integration_type.value,
+            "redirect_uri": redirect_uri
+        }, ttl=600)
+
         # Build OAuth URL based on integration type
         oauth_url = self._build_oauth_url(integration_type, state, redirect_uri)
         
@@ -57,88 +199,65 @@ class IntegrationService:
     
     def _build_oauth_url(self, integration_type: IntegrationType, state: str, redirect_uri: str) -> str:
         """Build OAuth URL for specific integration"""
-        oauth_configs = {
-            IntegrationType.SLACK: {
-                "base_url": "https://slack.com/oauth/v2/authorize",
-                "client_id": settings.SLACK_CLIENT_ID,
-                "scopes": "channels:read,chat:write,users:read,im:read,im:write"
-            },
-            IntegrationType.GOOGLE: {
-                "base_url": "https://accounts.google.com/o/oauth2/v2/auth",
-                "client_id": settings.GOOGLE_CLIENT_ID,
-                "scopes": "https://www.googleapis.com/auth/gmail.modify https://www.googleapis.com/auth/calendar https://www.googleapis.com/auth/drive"
-            },
-            IntegrationType.GITHUB: {
-                "base_url": "https://github.com/login/oauth/authorize",
-                "client_id": settings.GITHUB_CLIENT_ID,
-                "scopes": "repo,user,write:discussion"
-            },
-            IntegrationType.NOTION: {
-                "base_url": "https://api.notion.com/v1/oauth/authorize",
-                "client_id": settings.NOTION_CLIENT_ID,
-                "scopes": "read_content,update_content,insert_content"
-            }
-        }
-        
-        config = oauth_configs.get(integration_type)
-        if not config:
+        prefix = _OAUTH_PREFIXES.get(integration_type)
+        if not prefix:
             raise Exception(f"OAuth not configured for {integration_type}")
-        
-        params = {
-            "client_id": config["client_id"],
-            "redirect_uri": redirect_uri,
-            "response_type": "code",
-            "scope": config["scopes"],
-            "state": state
-        }
-        
-        return f"{config['base_url']}?{urlencode(params)}"
+
+        # state comes from token_urlsafe and needs no quoting
+        return f"{prefix}&redirect_uri={quote(redirect_uri, safe='')}&state={state}"
     
     async def complete_oauth(self, code: str, state: str) -> Dict[str, Any]:
         """Complete OAuth flow and create integration"""
-        # Verify state
-        oauth_state_doc = await self.db.oauth_states.find_one({"state": state})
-        if not oauth_state_doc:
-            raise Exception("Invalid OAuth state")
-        
-        oauth_state = OAuthState(**oauth_state_doc)
-        
-        if oauth_state.expires_at < datetime.utcnow():
-            raise Exception("OAuth state expired")
-        
+        # Verify and consume the state; Redis TTL covers expiry, and the
+        # pop makes each state single-use
+        oauth_state = await pop_oauth_state(state)
+        if not oauth_state:
+            raise Exception("Invalid or expired OAuth state")
+
+        integration_type = IntegrationType(oauth_state["integration_type"])
+        user_id = oauth_state["user_id"]
+        redirect_uri = oauth_state.get("redirect_uri")
+
         # Exchange code for tokens
-        tokens = await self._exchange_code_for_tokens(oauth_state.integration_type, code, oauth_state.redirect_uri)
-        
-        # Get user info from the integration
-        user_info = await self._get_integration_user_info(oauth_state.integration_type, tokens["access_token"])
-        
+        tokens = await self._exchange_code_for_tokens(integration_type, code, redirect_uri)
+
+        # The provider user-info call and our user lookup are independent;
+        # run them concurrently so the callback waits on the slower one only
+        user_info, user = await asyncio.gather(
+            self._get_integration_user_info(integration_type, tokens["access_token"]),
+            self.db.users.find_one({"id": user_id}, {"team_id": 1, "_id": 0})
+        )
+
+        # Encrypt both tokens off the event loop so a burst of OAuth
+        # callbacks does not serialize behind AES work
+        enc_access, enc_refresh = await asyncio.gather(
+            aencrypt_oauth_token(tokens["access_token"]),
+            aencrypt_oauth_token(tokens.get("refresh_token", ""))
+        )
+
         # Create or update integration
         integration = Integration(
-            user_id=oauth_state.user_id,
-            team_id="",  # Will be filled from user's team
-            integration_type=oauth_state.integration_type,
-            name=f"{oauth_state.integration_type.value.title()} - {user_info.get('name', 'Default')}",
+            user_id=user_id,
+            team_id=user.get("team_id", "") if user else "",
+            integration_type=integration_type,
+            name=f"{integration_type.value.title()} - {user_info.get('name', 'Default')}",
             status=IntegrationStatus.ACTIVE,
-            access_token=encrypt_oauth_token(tokens["access_token"]),
-            refresh_token=encrypt_oauth_token(tokens.get("refresh_token", "")),
+            access_token=enc_access,
+            refresh_token=enc_refresh,
             expires_at=datetime.utcnow() + timedelta(seconds=tokens.get("expires_in", 3600)),
             external_user_id=user_info.get("id"),
             external_workspace_id=user_info.get("workspace_id"),
             scopes=tokens.get("scope", "").split(",") if tokens.get("scope") else [],
             last_sync=datetime.utcnow()
         )
-        
-        # Get user's team_id
-        user = await self.db.users.find_one({"id": oauth_state.user_id})
-        if user:
-            integration.team_id = user.get("team_id", "")
-        
-        # Save integration
-        await self.db.integrations.insert_one(integration.dict())
-        
-        # Clean up OAuth state
-        await self.db.oauth_states.delete_one({"state": state})
-        
+
+        # Save integration and signal subscribers to drop their cached
+        # integration lists for this user. model_dump is the v2 fast path;
+        # .dict() is the deprecated v1 shim on top of it.
+        await self.db.integrations.insert_one(integration.model_dump())
+        self._action_cache.pop((user_id, integration_type.value), None)
+        await get_redis().publish("integrations:invalidate", user_id)
+
         return {
             "integration_id": integration.id,
             "integration_type": integration.integration_type,
@@ -147,25 +266,7 @@ class IntegrationService:
     
     async def _exchange_code_for_tokens(self, integration_type: IntegrationType, code: str, redirect_uri: str) -> Dict[str, Any]:
         """Exchange authorization code for access tokens"""
-        token_endpoints = {
-            IntegrationType.SLACK: {
-                "url": "https://slack.com/api/oauth.v2.access",
-                "client_id": settings.SLACK_CLIENT_ID,
-                "client_secret": settings.SLACK_CLIENT_SECRET
-            },
-            IntegrationType.GOOGLE: {
-                "url": "https://oauth2.googleapis.com/token",
-                "client_id": settings.GOOGLE_CLIENT_ID,
-                "client_secret": settings.GOOGLE_CLIENT_SECRET
-            },
-            IntegrationType.GITHUB: {
-                "url": "https://github.com/login/oauth/access_token",
-                "client_id": settings.GITHUB_CLIENT_ID,
-                "client_secret": settings.GITHUB_CLIENT_SECRET
-            }
-        }
-        
-        config = token_endpoints.get(integration_type)
+        config = _TOKEN_ENDPOINTS.get(integration_type)
         if not config:
             raise Exception(f"Token exchange not configured for {integration_type}")
         
@@ -182,49 +283,49 @@ class IntegrationService:
         response = await self.http_client.post(config["url"], data=data, headers=headers)
         response.raise_for_status()
         
-        return response.json()
+        return orjson.loads(response.content)
     
     async def _get_integration_user_info(self, integration_type: IntegrationType, access_token: str) -> Dict[str, Any]:
         """Get user info from integration API"""
-        user_info_endpoints = {
-            IntegrationType.SLACK: {
-                "url": "https://slack.com/api/auth.test",
-                "headers": {"Authorization": f"Bearer {access_token}"}
-            },
-            IntegrationType.GOOGLE: {
-                "url": "https://www.googleapis.com/oauth2/v2/userinfo",
-                "headers": {"Authorization": f"Bearer {access_token}"}
-            },
-            IntegrationType.GITHUB: {
-                "url": "https://api.github.com/user",
-                "headers": {"Authorization": f"Bearer {access_token}"}
-            }
-        }
-        
-        config = user_info_endpoints.get(integration_type)
-        if not config:
+        url = _USER_INFO_URLS.get(integration_type)
+        if not url:
             return {}
-        
-        response = await self.http_client.get(config["url"], headers=config["headers"])
+
+        response = await self.http_client.get(
+            url, headers={"Authorization": f"Bearer {access_token}"}
+        )
         response.raise_for_status()
-        
-        return response.json()
+
+        return orjson.loads(response.content)
     
     async def execute_action(self, user_id: str, integration_type: IntegrationType, action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Execute an action on an integration"""
-        # Get user's integration
-        integration_doc = await self.db.integrations.find_one({
-            "user_id": user_id,
-            "integration_type": integration_type,
-            "status": IntegrationStatus.ACTIVE
-        })
-        
-        if not integration_doc:
-            raise Exception(f"No active {integration_type} integration found")
-        
-        integration = Integration(**integration_doc)
-        access_token = decrypt_oauth_token(integration.access_token)
-        
+        cache_key = (user_id, integration_type.value)
+        access_token = self._action_cache.get(cache_key)
+        if access_token is None:
+            # Get user's integration — only the token is needed here, so
+            # skip shipping and validating the rest of the document
+            integration_doc = await self.db.integrations.find_one(
+                {
+                    "user_id": user_id,
+                    "integration_type": integration_type,
+                    "status": IntegrationStatus.ACTIVE
+                },
+                {"access_token": 1, "_id": 0}
+            )
+
+            if not integration_doc:
+                raise Exception(f"No active {integration_type} integration found")
+
+            access_token = await asyncio.to_thread(
+                _decrypt_cached, integration_doc["access_token"]
+            )
+            self._action_cache[cache_key] = access_token
+
+        bucket = self._rate_limits.get(integration_type)
+        if bucket:
+            await bucket.acquire()
+
         # Route to appropriate action handler
         if integration_type == IntegrationType.SLACK:
             return await self._execute_slack_action(access_token, action, parameters)
@@ -242,11 +343,11 @@ class IntegrationService:
         if action == "send_message":
             response = await self.http_client.post(
                 "https://slack.com/api/chat.postMessage",
-                headers=headers,
-                json={
+                headers={**headers, "Content-Type": "application/json"},
+                content=orjson.dumps({
                     "channel": parameters["channel"],
                     "text": parameters["text"]
-                }
+                })
             )
         elif action == "list_channels":
             response = await self.http_client.get(
@@ -257,7 +358,7 @@ class IntegrationService:
             raise Exception(f"Unknown Slack action: {action}")
         
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
     async def _execute_google_action(self, access_token: str, action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Execute Google Workspace actions"""
@@ -273,7 +374,7 @@ class IntegrationService:
                 params={"q": parameters.get("query", "")}
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         else:
             raise Exception(f"Unknown Google action: {action}")
     
@@ -289,24 +390,96 @@ class IntegrationService:
         elif action == "create_issue":
             response = await self.http_client.post(
                 f"https://api.github.com/repos/{parameters['owner']}/{parameters['repo']}/issues",
-                headers=headers,
-                json={
+                headers={**headers, "Content-Type": "application/json"},
+                content=orjson.dumps({
                     "title": parameters["title"],
                     "body": parameters["body"]
-                }
+                })
             )
         else:
             raise Exception(f"Unknown GitHub action: {action}")
         
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
+    async def refresh_expiring(self, within: timedelta = timedelta(minutes=10)) -> int:
+        """Refresh active integrations whose tokens expire within `within`
+
+        Renewals fan out concurrently but a per-provider semaphore keeps
+        each provider at ≤10 in flight, so a large refresh sweep finishes
+        in O(N/concurrency) without tripping provider rate limits.
+        """
+        db = self._get_db()
+        cutoff = datetime.utcnow() + within
+        expiring = await db.integrations.find(
+            {"status": "active", "expires_at": {"$lt": cutoff}},
+            {"id": 1, "user_id": 1, "integration_type": 1, "refresh_token": 1, "_id": 0}
+        ).to_list(1000)
+
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        async def _refresh_one(doc: Dict[str, Any]) -> bool:
+            sem = semaphores.setdefault(
+                doc["integration_type"], asyncio.Semaphore(10)
+            )
+            async with sem:
+                return await self._refresh_integration_tokens(doc)
+
+        results = await asyncio.gather(
+            *(_refresh_one(doc) for doc in expiring),
+            return_exceptions=True
+        )
+        return sum(1 for r in results if r is True)
+
+    async def _refresh_integration_tokens(self, doc: Dict[str, Any]) -> bool:
+        """Renew one integration's tokens via the provider refresh grant"""
+        integration_type = IntegrationType(doc["integration_type"])
+        config = _TOKEN_ENDPOINTS.get(integration_type)
+        refresh_token = await asyncio.to_thread(
+            _decrypt_cached, doc.get("refresh_token") or ""
+        )
+        if not config or not refresh_token:
+            return False
+
+        bucket = self._rate_limits.get(integration_type)
+        if bucket:
+            await bucket.acquire()
+
+        response = await self.http_client.post(
+            config["url"],
+            data={
+                "client_id": config["client_id"],
+                "client_secret": config["client_secret"],
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token
+            },
+            headers={"Accept": "application/json"}
+        )
+        response.raise_for_status()
+        tokens = orjson.loads(response.content)
+
+        update = {
+            "access_token": await aencrypt_oauth_token(tokens["access_token"]),
+            "expires_at": datetime.utcnow() + timedelta(seconds=tokens.get("expires_in", 3600))
+        }
+        # Providers may rotate the refresh token; keep the old one otherwise
+        if tokens.get("refresh_token"):
+            update["refresh_token"] = await aencrypt_oauth_token(tokens["refresh_token"])
+
+        await self.db.integrations.update_one({"id": doc["id"]}, {"$set": update})
+        self._action_cache.pop((doc["user_id"], doc["integration_type"]), None)
+        return True
+
     async def delete_integration(self, user_id: str, integration_id: str) -> bool:
         """Delete user integration"""
         result = await self.db.integrations.delete_one({
             "id": integration_id,
             "user_id": user_id
         })
+        if result.deleted_count:
+            for key in [k for k in self._action_cache if k[0] == user_id]:
+                self._action_cache.pop(key, None)
+            await get_redis().publish("integrations:invalidate", user_id)
         return result.deleted_count > 0
 
 integration_service = IntegrationService()
\ No newline at end of file
@@ -1,12 +1,228 @@
-import json
+import asyncio
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 import httpx
+import orjson
+from cachetools import TTLCache
+from ciso8601 import parse_datetime
 from datetime import datetime
+from pymongo import UpdateOne
 
 from app.core.config import settings
 from app.models.workflow import Workflow, WorkflowExecution, WorkflowStep, ActionType, ExecutionStatus, TriggerType
 from app.db.mongodb import get_database
 
+# n8n node templates: the static shape of each node type is built once at
+# import; builders shallow-copy a template and fill in the per-node fields
+# (id, name, position, parameters)
+_WEBHOOK_TRIGGER_TEMPLATE = {
+    "id": "trigger-webhook",
+    "name": "Webhook Trigger",
+    "type": "n8n-nodes-base.webhook",
+    "typeVersion": 1,
+    "position": [250, 300]
+}
+
+_SCHEDULE_TRIGGER_TEMPLATE = {
+    "id": "trigger-schedule",
+    "name": "Schedule Trigger",
+    "type": "n8n-nodes-base.cron",
+    "typeVersion": 1,
+    "position": [250, 300]
+}
+
+_MANUAL_TRIGGER_NODE = {
+    "parameters": {},
+    "id": "trigger-manual",
+    "name": "Manual Trigger",
+    "type": "n8n-nodes-base.manualTrigger",
+    "typeVersion": 1,
+    "position": [250, 300]
+}
+
+_HTTP_REQUEST_TEMPLATE = {
+    "type": "n8n-nodes-base.httpRequest",
+    "typeVersion": 4.1
+}
+
+_OPENAI_TEMPLATE = {
+    "type": "n8n-nodes-base.openAi",
+    "typeVersion": 1.3
+}
+
+_FUNCTION_TEMPLATE = {
+    "type": "n8n-nodes-base.function",
+    "typeVersion": 1
+}
+
+_SLACK_TEMPLATE = {
+    "type": "n8n-nodes-base.slack",
+    "typeVersion": 2.1
+}
+
+_GITHUB_TEMPLATE = {
+    "type": "n8n-nodes-base.github",
+    "typeVersion": 1.2
+}
+
+# Node builders, dispatched by enum value instead of if/elif chains; the
+# tables at the bottom make registering a new type a one-line change
+def _finish_node(node: Dict[str, Any], node_id: str, name: str, position_y: int) -> Dict[str, Any]:
+    node["id"] = node_id
+    node["name"] = name
+    node["position"] = [450, position_y]
+    return node
+
+def _webhook_trigger_node(trigger_config: Dict[str, Any]) -> Dict[str, Any]:
+    node = _WEBHOOK_TRIGGER_TEMPLATE.copy()
+    node["parameters"] = {
+        "httpMethod": trigger_config.get("method", "POST"),
+        "path": trigger_config.get("path", "webhook"),
+        "responseMode": "responseNode",
+        "options": {}
+    }
+    return node
+
+def _schedule_trigger_node(trigger_config: Dict[str, Any]) -> Dict[str, Any]:
+    node = _SCHEDULE_TRIGGER_TEMPLATE.copy()
+    node["parameters"] = {
+        "rule": {
+            "interval": trigger_config.get("interval", [{"field": "cronExpression", "expression": "0 9 * * *"}])
+        }
+    }
+    return node
+
+def _manual_trigger_node(trigger_config: Dict[str, Any]) -> Dict[str, Any]:
+    # Fully static, no copy needed
+    return _MANUAL_TRIGGER_NODE
+
+def _http_request_node(step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
+    config = step.config
+    method = config.get("method", "GET")
+    node = _HTTP_REQUEST_TEMPLATE.copy()
+    node["parameters"] = {
+        "url": config.get("url", ""),
+        "requestMethod": method,
+        "sendHeaders": True,
+        "headerParameters": {
+            "parameters": config.get("headers", [])
+        },
+        "sendBody": method in ("POST", "PUT", "PATCH"),
+        "bodyParameters": {
+            "parameters": config.get("body", [])
+        }
+    }
+    return _finish_node(node, node_id, step.name, position_y)
+
+def _openai_node(step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
+    config = step.config
+    node = _OPENAI_TEMPLATE.copy()
+    node["parameters"] = {
+        "model": config.get("model", "gpt-4"),
+        "messages": {
+            "values": [
+                {
+                    "role": "user",
+                    "content": config.get("prompt", "")
+                }
+            ]
+        }
+    }
+    return _finish_node(node, node_id, step.name, position_y)
+
+def _function_node(step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
+    # Default function node for custom logic
+    node = _FUNCTION_TEMPLATE.copy()
+    node["parameters"] = {
+        "functionCode": step.config.get("code", "return items;")
+    }
+    return _finish_node(node, node_id, step.name, position_y)
+
+def _slack_integration_node(step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
+    config = step.config
+    node = _SLACK_TEMPLATE.copy()
+    node["parameters"] = {
+        "authentication": "oAuth2",
+        "resource": "message",
+        "operation": config.get("operation", "post"),
+        "channel": config.get("channel", ""),
+        "text": config.get("text", "")
+    }
+    return _finish_node(node, node_id, step.name, position_y)
+
+def _github_integration_node(step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
+    config = step.config
+    node = _GITHUB_TEMPLATE.copy()
+    node["parameters"] = {
+        "authentication": "oAuth2",
+        "resource": "issue",
+        "operation": config.get("operation", "create"),
+        "owner": config.get("owner", ""),
+        "repository": config.get("repository", ""),
+        "title": config.get("title", ""),
+        "body": config.get("body", "")
+    }
+    return _finish_node(node, node_id, step.name, position_y)
+
+def _generic_integration_node(step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
+    # Generic HTTP request for other integrations
+    config = step.config
+    node = _HTTP_REQUEST_TEMPLATE.copy()
+    node["parameters"] = {
+        "url": config.get("url", ""),
+        "requestMethod": config.get("method", "POST")
+    }
+    return _finish_node(node, node_id, step.name, position_y)
+
+def _integration_node(step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
+    builder = _INTEGRATION_BUILDERS.get(
+        step.config.get("integration_type", ""), _generic_integration_node
+    )
+    return builder(step, node_id, position_y)
+
+_TRIGGER_BUILDERS = {
+    TriggerType.WEBHOOK: _webhook_trigger_node,
+    TriggerType.SCHEDULE: _schedule_trigger_node,
+    TriggerType.MANUAL: _manual_trigger_node
+}
+
+_STEP_BUILDERS = {
+    ActionType.API_CALL: _http_request_node,
+    ActionType.INTEGRATION_ACTION: _integration_node,
+    ActionType.AI_PROCESS: _openai_node
+}
+
+_INTEGRATION_BUILDERS = {
+    "slack": _slack_integration_node,
+    "github": _github_integration_node
+}
+
+# Per-step payload cap for persisted execution results. n8n execution
+# data can run to megabytes per step; storing it whole triples memory on
+# every poll (n8n → Python → BSON) and courts Mongo's 16 MB document
+# limit. Full output stays in n8n and is fetchable by execution id.
+_STEP_RESULT_MAX_BYTES = 4096
+
+def _summarize_step_result(value: Any) -> Any:
+    """Bound one step's result to a size-tagged preview when oversized"""
+    raw = orjson.dumps(value)
+    if len(raw) <= _STEP_RESULT_MAX_BYTES:
+        return value
+    return {
+        "truncated": True,
+        "size_bytes": len(raw),
+        "preview": raw[:_STEP_RESULT_MAX_BYTES].decode("utf-8", "replace")
+    }
+
+@lru_cache(maxsize=1024)
+def _parse_n8n_timestamp(value: str) -> datetime:
+    """Parse an n8n ISO timestamp (handles trailing Z natively)
+
+    Cached: repeated polls of a finished execution return the identical
+    finishedAt string.
+    """
+    return parse_datetime(value)
+
 class N8NService:
     def __init__(self):
         self.base_url = settings.N8N_BASE_URL
@@ -14,12 +230,51 @@ class N8NService:
         self.webhook_url = settings.N8N_WEBHOOK_URL
         self.db = None
         
+        # Single-host client: HTTP/2 multiplexes concurrent /workflows and
+        # /executions calls over one keep-alive connection
+        # Content-Type set once: request bodies are orjson-encoded bytes
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
         self.http_client = httpx.AsyncClient(
             base_url=self.base_url,
-            headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else {},
+            headers=headers,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30
+            ),
             timeout=30.0
         )
-    
+
+        # Status polls arriving within a short window coalesce into one
+        # $in query plus gathered n8n GETs instead of N of each
+        self._status_pending: Dict[str, asyncio.Future] = {}
+        self._status_flush_scheduled = False
+
+        # Hot workflows fire repeatedly; a short TTL skips re-reading an
+        # unchanged document per execution
+        self._workflow_cache = TTLCache(maxsize=10_000, ttl=60)
+
+        # In-flight background execution submissions (strong refs)
+        self._submit_tasks: set = set()
+
+    async def close(self):
+        """Close the shared HTTP client (called at app shutdown)"""
+        await self.http_client.aclose()
+
+    async def warmup(self):
+        """Prime the connection pool so the first real call skips TCP+TLS
+
+        Best effort: an unreachable n8n must not fail startup — the next
+        workflow call pays the handshake and surfaces the real error.
+        """
+        try:
+            await self.http_client.get("/healthz", timeout=2.0)
+        except Exception:
+            pass
+
     def _get_db(self):
         if not self.db:
             self.db = get_database()
@@ -30,10 +285,12 @@ class N8NService:
         n8n_workflow_data = self._convert_to_n8n_format(workflow)
         
         try:
-            response = await self.http_client.post("/api/v1/workflows", json=n8n_workflow_data)
+            response = await self.http_client.post(
+                "/api/v1/workflows", content=orjson.dumps(n8n_workflow_data)
+            )
             response.raise_for_status()
             
-            result = response.json()
+            result = orjson.loads(response.content)
             n8n_workflow_id = result["data"]["id"]
             
             # Activate the workflow
@@ -45,31 +302,30 @@ class N8NService:
     
     def _convert_to_n8n_format(self, workflow: Workflow) -> Dict[str, Any]:
         """Convert Loki workflow to n8n format"""
-        nodes = []
+        # Preallocate: the node count is known, so the list never regrows
+        steps = workflow.steps
+        nodes = [None] * (len(steps) + 1)
         connections = {}
-        
+
         # Create trigger node
         trigger_node = self._create_trigger_node(workflow.trigger_type, workflow.trigger_config)
-        nodes.append(trigger_node)
-        
-        # Create step nodes
+        nodes[0] = trigger_node
+
+        # Create step nodes, chaining each to its predecessor
         previous_node = trigger_node["name"]
-        for i, step in enumerate(workflow.steps):
+        for i, step in enumerate(steps):
             step_node = self._create_step_node(step, i)
-            nodes.append(step_node)
-            
-            # Connect to previous node
-            if previous_node not in connections:
-                connections[previous_node] = {"main": [[]]}
-            
-            connections[previous_node]["main"][0].append({
-                "node": step_node["name"],
+            nodes[i + 1] = step_node
+            step_node_name = step_node["name"]
+
+            connections.setdefault(previous_node, {"main": [[]]})["main"][0].append({
+                "node": step_node_name,
                 "type": "main",
                 "index": 0
             })
-            
-            previous_node = step_node["name"]
-        
+
+            previous_node = step_node_name
+
         return {
             "name": workflow.name,
             "active": True,
@@ -83,215 +339,199 @@ class N8NService:
     
     def _create_trigger_node(self, trigger_type: TriggerType, trigger_config: Dict[str, Any]) -> Dict[str, Any]:
         """Create n8n trigger node based on trigger type"""
-        if trigger_type == TriggerType.WEBHOOK:
-            return {
-                "parameters": {
-                    "httpMethod": trigger_config.get("method", "POST"),
-                    "path": trigger_config.get("path", "webhook"),
-                    "responseMode": "responseNode",
-                    "options": {}
-                },
-                "id": "trigger-webhook",
-                "name": "Webhook Trigger",
-                "type": "n8n-nodes-base.webhook",
-                "typeVersion": 1,
-                "position": [250, 300]
-            }
-        elif trigger_type == TriggerType.SCHEDULE:
-            return {
-                "parameters": {
-                    "rule": {
-                        "interval": trigger_config.get("interval", [{"field": "cronExpression", "expression": "0 9 * * *"}])
-                    }
-                },
-                "id": "trigger-schedule",
-                "name": "Schedule Trigger",
-                "type": "n8n-nodes-base.cron",
-                "typeVersion": 1,
-                "position": [250, 300]
-            }
-        else:
-            # Manual trigger
-            return {
-                "parameters": {},
-                "id": "trigger-manual",
-                "name": "Manual Trigger",
-                "type": "n8n-nodes-base.manualTrigger",
-                "typeVersion": 1,
-                "position": [250, 300]
-            }
-    
+        return _TRIGGER_BUILDERS.get(trigger_type, _manual_trigger_node)(trigger_config)
+
     def _create_step_node(self, step: WorkflowStep, index: int) -> Dict[str, Any]:
         """Create n8n node for workflow step"""
         node_id = f"step-{index}-{step.id}"
         position_y = 300 + (index + 1) * 180
-        
-        if step.action_type == ActionType.API_CALL:
-            return {
-                "parameters": {
-                    "url": step.config.get("url", ""),
-                    "requestMethod": step.config.get("method", "GET"),
-                    "sendHeaders": True,
-                    "headerParameters": {
-                        "parameters": step.config.get("headers", [])
-                    },
-                    "sendBody": step.config.get("method", "GET") in ["POST", "PUT", "PATCH"],
-                    "bodyParameters": {
-                        "parameters": step.config.get("body", [])
-                    }
-                },
-                "id": node_id,
-                "name": step.name,
-                "type": "n8n-nodes-base.httpRequest",
-                "typeVersion": 4.1,
-                "position": [450, position_y]
-            }
-        elif step.action_type == ActionType.INTEGRATION_ACTION:
-            return self._create_integration_node(step, node_id, position_y)
-        elif step.action_type == ActionType.AI_PROCESS:
-            return {
-                "parameters": {
-                    "model": step.config.get("model", "gpt-4"),
-                    "messages": {
-                        "values": [
-                            {
-                                "role": "user",
-                                "content": step.config.get("prompt", "")
-                            }
-                        ]
-                    }
-                },
-                "id": node_id,
-                "name": step.name,
-                "type": "n8n-nodes-base.openAi",
-                "typeVersion": 1.3,
-                "position": [450, position_y]
-            }
-        else:
-            # Default function node for custom logic
-            return {
-                "parameters": {
-                    "functionCode": step.config.get("code", "return items;")
-                },
-                "id": node_id,
-                "name": step.name,
-                "type": "n8n-nodes-base.function",
-                "typeVersion": 1,
-                "position": [450, position_y]
-            }
-    
+        return _STEP_BUILDERS.get(step.action_type, _function_node)(step, node_id, position_y)
+
     def _create_integration_node(self, step: WorkflowStep, node_id: str, position_y: int) -> Dict[str, Any]:
         """Create integration-specific n8n node"""
-        integration_type = step.config.get("integration_type", "")
-        
-        if integration_type == "slack":
-            return {
-                "parameters": {
-                    "authentication": "oAuth2",
-                    "resource": "message",
-                    "operation": step.config.get("operation", "post"),
-                    "channel": step.config.get("channel", ""),
-                    "text": step.config.get("text", "")
-                },
-                "id": node_id,
-                "name": step.name,
-                "type": "n8n-nodes-base.slack",
-                "typeVersion": 2.1,
-                "position": [450, position_y]
-            }
-        elif integration_type == "github":
-            return {
-                "parameters": {
-                    "authentication": "oAuth2",
-                    "resource": "issue",
-                    "operation": step.config.get("operation", "create"),
-                    "owner": step.config.get("owner", ""),
-                    "repository": step.config.get("repository", ""),
-                    "title": step.config.get("title", ""),
-                    "body": step.config.get("body", "")
-                },
-                "id": node_id,
-                "name": step.name,
-                "type": "n8n-nodes-base.github",
-                "typeVersion": 1.2,
-                "position": [450, position_y]
-            }
-        else:
-            # Generic HTTP request for other integrations
-            return {
-                "parameters": {
-                    "url": step.config.get("url", ""),
-                    "requestMethod": step.config.get("method", "POST")
-                },
-                "id": node_id,
-                "name": step.name,
-                "type": "n8n-nodes-base.httpRequest",
-                "typeVersion": 4.1,
-                "position": [450, position_y]
-            }
+        return _integration_node(step, node_id, position_y)
     
     async def _activate_n8n_workflow(self, n8n_workflow_id: str):
         """Activate n8n workflow"""
         try:
             await self.http_client.patch(
                 f"/api/v1/workflows/{n8n_workflow_id}/activate",
-                json={"active": True}
+                content=orjson.dumps({"active": True})
             )
         except Exception as e:
             raise Exception(f"Failed to activate n8n workflow: {str(e)}")
     
-    async def execute_workflow(self, workflow_id: str, trigger_data: Dict[str, Any] = None) -> str:
-        """Execute n8n workflow and return execution ID"""
-        workflow_doc = await self.db.workflows.find_one({"id": workflow_id})
+    # Trigger/poll paths read 2-3 fields; shipping and validating the
+    # full Workflow document per call bought nothing
+    _WORKFLOW_PROJECTION = {
+        "_id": 0,
+        "n8n_workflow_id": 1,
+        "user_id": 1,
+        "trigger_type": 1,
+        "trigger_config.path": 1
+    }
+
+    async def _get_workflow(self, workflow_id: str) -> Dict[str, Any]:
+        """Fetch the trigger-path workflow fields, TTL-cached
+
+        Returns the projected document as-is: these read-only paths index
+        a handful of fields, so full Pydantic validation is skipped.
+        """
+        workflow = self._workflow_cache.get(workflow_id)
+        if workflow is not None:
+            return workflow
+
+        workflow_doc = await self._get_db().workflows.find_one(
+            {"id": workflow_id}, self._WORKFLOW_PROJECTION
+        )
         if not workflow_doc:
             raise Exception("Workflow not found")
-        
-        workflow = Workflow(**workflow_doc)
-        
-        if not workflow.n8n_workflow_id:
+
+        self._workflow_cache[workflow_id] = workflow_doc
+        return workflow_doc
+
+    async def execute_workflow(self, workflow_id: str, trigger_data: Dict[str, Any] = None) -> str:
+        """Queue an n8n workflow execution and return its id immediately
+
+        The execution record is inserted as PENDING and the n8n RPC runs
+        as a background task that flips it to RUNNING (or FAILED), so the
+        caller's latency excludes the n8n round trip. The local id is the
+        stable key the status polls already use.
+        """
+        workflow = await self._get_workflow(workflow_id)
+
+        n8n_workflow_id = workflow.get("n8n_workflow_id")
+        if not n8n_workflow_id:
             raise Exception("Workflow not deployed to n8n")
-        
+
+        execution = WorkflowExecution(
+            workflow_id=workflow_id,
+            user_id=workflow.get("user_id", ""),
+            status=ExecutionStatus.PENDING,
+            trigger_data=trigger_data or {}
+        )
+        await self.db.workflow_executions.insert_one(execution.model_dump())
+
+        # Strong reference keeps the submission alive until it finishes
+        task = asyncio.create_task(
+            self._submit_execution(execution.id, n8n_workflow_id, trigger_data)
+        )
+        self._submit_tasks.add(task)
+        task.add_done_callback(self._submit_tasks.discard)
+
+        return execution.id
+
+    async def _submit_execution(self, execution_id: str, n8n_workflow_id: str, trigger_data: Optional[Dict[str, Any]]):
+        """Submit one queued execution to n8n and record the outcome"""
         try:
             response = await self.http_client.post(
-                f"/api/v1/workflows/{workflow.n8n_workflow_id}/execute",
-                json={"triggerData": trigger_data or {}}
+                f"/api/v1/workflows/{n8n_workflow_id}/execute",
+                content=orjson.dumps({"triggerData": trigger_data or {}})
             )
             response.raise_for_status()
-            
-            result = response.json()
-            n8n_execution_id = result["data"]["id"]
-            
-            # Create execution record
-            execution = WorkflowExecution(
-                workflow_id=workflow_id,
-                user_id=workflow.user_id,
-                status=ExecutionStatus.RUNNING,
-                trigger_data=trigger_data or {},
-                n8n_execution_id=str(n8n_execution_id)
+
+            n8n_execution_id = orjson.loads(response.content)["data"]["id"]
+            await self.db.workflow_executions.update_one(
+                {"id": execution_id},
+                {"$set": {
+                    "n8n_execution_id": str(n8n_execution_id),
+                    "status": ExecutionStatus.RUNNING
+                }}
             )
-            
-            await self.db.workflow_executions.insert_one(execution.dict())
-            
-            return execution.id
         except Exception as e:
-            raise Exception(f"Failed to execute n8n workflow: {str(e)}")
+            await self.db.workflow_executions.update_one(
+                {"id": execution_id},
+                {"$set": {
+                    "status": ExecutionStatus.FAILED,
+                    "error_message": f"Failed to execute n8n workflow: {str(e)}"
+                }}
+            )
     
     async def get_execution_status(self, execution_id: str) -> Dict[str, Any]:
-        """Get workflow execution status from n8n"""
-        execution_doc = await self.db.workflow_executions.find_one({"id": execution_id})
+        """Get workflow execution status from n8n
+
+        Polls arriving within a 5ms window are answered from one batched
+        Mongo read and a gathered set of n8n GETs; a UI polling N running
+        executions costs one round trip per backend instead of N.
+        """
+        loop = asyncio.get_running_loop()
+        future = self._status_pending.get(execution_id)
+        if future is None:
+            future = loop.create_future()
+            self._status_pending[execution_id] = future
+            if not self._status_flush_scheduled:
+                self._status_flush_scheduled = True
+                loop.call_later(
+                    0.005,
+                    lambda: asyncio.ensure_future(self._flush_status_polls())
+                )
+        # Shield: one poller cancelling must not fail the shared batch
+        return await asyncio.shield(future)
+
+    async def _flush_status_polls(self):
+        """Resolve all queued status polls with one read and gathered GETs"""
+        pending = self._status_pending
+        self._status_pending = {}
+        self._status_flush_scheduled = False
+        if not pending:
+            return
+
+        ids = list(pending)
+        try:
+            db = self._get_db()
+            # batch_size(len(ids)) returns the whole batch in one server
+            # reply instead of the default 101-doc first batch + getMore
+            docs = await db.workflow_executions.find(
+                {"id": {"$in": ids}},
+                {"_id": 0, "id": 1, "n8n_execution_id": 1, "status": 1, "started_at": 1}
+            ).batch_size(len(ids)).to_list(len(ids))
+            by_id = {doc["id"]: doc for doc in docs}
+
+            # Each poll appends its status update here; the writes land as
+            # one unordered bulk_write instead of one RTT per execution
+            ops: List[UpdateOne] = []
+            results = await asyncio.gather(
+                *(self._poll_one(by_id.get(eid), ops) for eid in ids),
+                return_exceptions=True
+            )
+            if ops:
+                await db.workflow_executions.bulk_write(ops, ordered=False)
+            for eid, result in zip(ids, results):
+                future = pending[eid]
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _poll_one(
+        self,
+        execution_doc: Optional[Dict[str, Any]],
+        ops: List[UpdateOne]
+    ) -> Dict[str, Any]:
+        """Fetch one execution's status from n8n, queuing its update"""
         if not execution_doc:
             raise Exception("Execution not found")
-        
-        execution = WorkflowExecution(**execution_doc)
-        
-        if not execution.n8n_execution_id:
-            return {"status": execution.status, "error": "No n8n execution ID"}
-        
+
+        # Three fields are read from the projected doc; rebuilding the
+        # full WorkflowExecution model here was pure validation overhead
+        execution_id = execution_doc["id"]
+        n8n_execution_id = execution_doc.get("n8n_execution_id")
+        started_at = execution_doc.get("started_at")
+
+        if not n8n_execution_id:
+            return {"status": execution_doc.get("status"), "error": "No n8n execution ID"}
+
         try:
-            response = await self.http_client.get(f"/api/v1/executions/{execution.n8n_execution_id}")
+            response = await self.http_client.get(f"/api/v1/executions/{n8n_execution_id}")
             response.raise_for_status()
             
-            n8n_execution = response.json()["data"]
+            n8n_execution = orjson.loads(response.content)["data"]
             
             # Map n8n status to our status
             status_mapping = {
@@ -303,29 +543,34 @@ class N8NService:
             }
             
             our_status = status_mapping.get(n8n_execution["status"], ExecutionStatus.FAILED)
-            
+
+            # Summarize per-step output before it touches Mongo or the
+            # response; oversized payloads become size-tagged previews
+            step_results = {
+                k: _summarize_step_result(v)
+                for k, v in n8n_execution.get("data", {}).items()
+            }
+
             # Update our execution record
             update_data = {
                 "status": our_status,
-                "step_results": n8n_execution.get("data", {}),
+                "step_results": step_results,
                 "error_message": n8n_execution.get("error", "")
             }
-            
+
             if n8n_execution.get("finishedAt"):
-                update_data["completed_at"] = datetime.fromisoformat(n8n_execution["finishedAt"].replace("Z", "+00:00"))
-                if execution.started_at and update_data["completed_at"]:
-                    update_data["duration_seconds"] = (update_data["completed_at"] - execution.started_at).total_seconds()
-            
-            await self.db.workflow_executions.update_one(
-                {"id": execution_id},
-                {"$set": update_data}
-            )
-            
+                update_data["completed_at"] = _parse_n8n_timestamp(n8n_execution["finishedAt"])
+                if started_at and update_data["completed_at"]:
+                    update_data["duration_seconds"] = (update_data["completed_at"] - started_at).total_seconds()
+
+            ops.append(UpdateOne({"id": execution_id}, {"$set": update_data}))
+
+
             return {
                 "status": our_status,
-                "step_results": n8n_execution.get("data", {}),
+                "step_results": step_results,
                 "error_message": n8n_execution.get("error", ""),
-                "started_at": execution.started_at.isoformat(),
+                "started_at": started_at.isoformat() if started_at else None,
                 "completed_at": update_data.get("completed_at").isoformat() if update_data.get("completed_at") else None
             }
         except Exception as e:
@@ -333,6 +578,13 @@ class N8NService:
     
     async def delete_n8n_workflow(self, n8n_workflow_id: str):
         """Delete workflow from n8n"""
+        # Evict any cached workflows deployed under this n8n id
+        stale = [
+            wid for wid, wf in self._workflow_cache.items()
+            if wf.get("n8n_workflow_id") == n8n_workflow_id
+        ]
+        for wid in stale:
+            self._workflow_cache.pop(wid, None)
         try:
             await self.http_client.delete(f"/api/v1/workflows/{n8n_workflow_id}")
         except Exception as e:
@@ -340,20 +592,16 @@ class N8NService:
     
     async def get_workflow_webhook_url(self, workflow_id: str) -> str:
         """Get webhook URL for workflow trigger"""
-        workflow_doc = await self.db.workflows.find_one({"id": workflow_id})
-        if not workflow_doc:
-            raise Exception("Workflow not found")
-        
-        workflow = Workflow(**workflow_doc)
-        
-        if workflow.trigger_type != TriggerType.WEBHOOK:
+        workflow = await self._get_workflow(workflow_id)
+
+        if workflow.get("trigger_type") != TriggerType.WEBHOOK.value:
             raise Exception("Workflow is not webhook-triggered")
-        
-        if not workflow.n8n_workflow_id:
+
+        if not workflow.get("n8n_workflow_id"):
             raise Exception("Workflow not deployed to n8n")
-        
+
         # n8n webhook URL format
-        webhook_path = workflow.trigger_config.get("path", "webhook")
+        webhook_path = workflow.get("trigger_config", {}).get("path", "webhook")
         return f"{self.webhook_url}/webhook/{webhook_path}"
 
 n8n_service = N8NService()
\ No newline at end of file
@@ -1,5 +1,8 @@
+import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from cachetools import TTLCache
+from pymongo import ReturnDocument
 
 from app.models.workflow import (
     Workflow, WorkflowCreate, WorkflowUpdate, WorkflowResponse,
@@ -9,29 +12,113 @@ from app.models.workflow import (
 from app.db.mongodb import get_database
 from app.services.n8n_service import n8n_service
 
+# List projections: ship only the response fields. steps_count is computed
+# server-side with $size so the steps arrays never cross the wire — they
+# dominate document size once workflows grow.
+_WORKFLOW_LIST_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "name": 1,
+    "description": 1,
+    "trigger_type": 1,
+    "trigger_config": 1,
+    "status": 1,
+    "tags": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "steps_count": {"$size": {"$ifNull": ["$steps", []]}}
+}
+
+_EXECUTION_LIST_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "workflow_id": 1,
+    "status": 1,
+    "started_at": 1,
+    "completed_at": 1,
+    "duration_seconds": 1,
+    "error_message": 1
+}
+
+# One packer shared by every dict→response path: the field mapping lives
+# in a single dict literal, so per-row cost is one call plus one BUILD_MAP
+# and the list paths stop repeating the ten-field construction inline
+def _workflow_response(doc: Dict[str, Any], steps_count: int) -> WorkflowResponse:
+    return WorkflowResponse.model_construct(
+        id=doc["id"],
+        name=doc["name"],
+        description=doc.get("description"),
+        trigger_type=doc["trigger_type"],
+        trigger_config=doc["trigger_config"],
+        status=doc["status"],
+        steps_count=steps_count,
+        tags=doc.get("tags", []),
+        created_at=doc["created_at"],
+        updated_at=doc["updated_at"]
+    )
+
+def _execution_response(doc: Dict[str, Any]) -> WorkflowExecutionResponse:
+    return WorkflowExecutionResponse.model_construct(
+        id=doc["id"],
+        workflow_id=doc["workflow_id"],
+        status=doc["status"],
+        started_at=doc["started_at"],
+        completed_at=doc.get("completed_at"),
+        duration_seconds=doc.get("duration_seconds"),
+        error_message=doc.get("error_message")
+    )
+
 class WorkflowService:
     def __init__(self):
         self.db = None
-    
+        # get_workflow backs every execute/deploy/delete; a short TTL
+        # turns a burst of calls against one workflow into one Mongo
+        # read. Every write path below pops its key.
+        self._workflow_cache = TTLCache(maxsize=10_000, ttl=30)
+
+        # Cache misses arriving within a short window coalesce into one
+        # $or query instead of one find_one each (same pattern as the
+        # n8n status polls)
+        self._load_pending: Dict[tuple, asyncio.Future] = {}
+        self._load_flush_scheduled = False
+
+    def _invalidate(self, workflow_id: str, user_id: str):
+        self._workflow_cache.pop((workflow_id, user_id), None)
+
     def _get_db(self):
         if not self.db:
             self.db = get_database()
         return self.db
     
-    async def create_workflow(self, user_id: str, team_id: str, workflow_data: WorkflowCreate) -> WorkflowResponse:
-        """Create a new workflow"""
-        workflow = Workflow(
+    @staticmethod
+    def _build_workflow(user_id: str, team_id: str, workflow_data: WorkflowCreate) -> Workflow:
+        """Build a fully populated Workflow from a create request.
+
+        Initial steps are numbered locally with enumerate, so a workflow
+        arriving with steps (template imports) is written in one
+        insert instead of a create plus N add_workflow_step round trips.
+        """
+        for order, step in enumerate(workflow_data.steps):
+            step.order = order
+        return Workflow(
             user_id=user_id,
             team_id=team_id,
             name=workflow_data.name,
             description=workflow_data.description,
             trigger_type=workflow_data.trigger_type,
-            trigger_config=workflow_data.trigger_config
+            trigger_config=workflow_data.trigger_config,
+            steps=workflow_data.steps
         )
-        
-        await self.db.workflows.insert_one(workflow.dict())
-        
-        return WorkflowResponse(
+
+    async def create_workflow(self, user_id: str, team_id: str, workflow_data: WorkflowCreate) -> WorkflowResponse:
+        """Create a new workflow"""
+        workflow = self._build_workflow(user_id, team_id, workflow_data)
+
+        await self.db.workflows.insert_one(workflow.model_dump())
+
+        # The model was validated on construction; the response copies
+        # fields straight across
+        return WorkflowResponse.model_construct(
             id=workflow.id,
             name=workflow.name,
             description=workflow.description,
@@ -43,80 +130,181 @@ class WorkflowService:
             created_at=workflow.created_at,
             updated_at=workflow.updated_at
         )
-    
-    async def get_user_workflows(self, user_id: str) -> List[WorkflowResponse]:
-        """Get all workflows for a user"""
-        workflows = await self.db.workflows.find({"user_id": user_id}).to_list(100)
-        
+
+    async def create_workflows_bulk(self, user_id: str, team_id: str, workflows_data: List[WorkflowCreate]) -> List[WorkflowResponse]:
+        """Create several workflows in one insert_many.
+
+        Template imports were issuing one insert per workflow; unordered
+        insert_many sends them as a single wire message and lets the
+        server apply them in parallel.
+        """
+        if not workflows_data:
+            return []
+
+        workflows = [
+            self._build_workflow(user_id, team_id, data)
+            for data in workflows_data
+        ]
+        await self.db.workflows.insert_many(
+            [w.model_dump() for w in workflows], ordered=False
+        )
+
         return [
-            WorkflowResponse(
-                id=w["id"],
-                name=w["name"],
-                description=w.get("description"),
-                trigger_type=w["trigger_type"],
-                trigger_config=w["trigger_config"],
-                status=w["status"],
-                steps_count=len(w.get("steps", [])),
-                tags=w.get("tags", []),
-                created_at=w["created_at"],
-                updated_at=w["updated_at"]
+            WorkflowResponse.model_construct(
+                id=w.id,
+                name=w.name,
+                description=w.description,
+                trigger_type=w.trigger_type,
+                trigger_config=w.trigger_config,
+                status=w.status,
+                steps_count=len(w.steps),
+                tags=w.tags,
+                created_at=w.created_at,
+                updated_at=w.updated_at
             )
             for w in workflows
         ]
     
+    async def get_user_workflows(self, user_id: str) -> List[WorkflowResponse]:
+        """Get all workflows for a user"""
+        workflows = await self.db.workflows.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$limit": 100},
+            {"$project": _WORKFLOW_LIST_PROJECTION}
+        ]).to_list(100)
+
+        # Trusted DB-sourced data; model_construct skips re-validation
+        return [_workflow_response(w, w["steps_count"]) for w in workflows]
+    
     async def get_workflow(self, workflow_id: str, user_id: str) -> Optional[Workflow]:
-        """Get workflow by ID"""
-        workflow_doc = await self.db.workflows.find_one({"id": workflow_id, "user_id": user_id})
-        return Workflow(**workflow_doc) if workflow_doc else None
+        """Get workflow by ID
+
+        Repeat reads come from the TTL cache; concurrent misses within a
+        5ms window share one batched Mongo query.
+        """
+        cache_key = (workflow_id, user_id)
+        workflow = self._workflow_cache.get(cache_key)
+        if workflow is not None:
+            return workflow
+
+        loop = asyncio.get_running_loop()
+        future = self._load_pending.get(cache_key)
+        if future is None:
+            future = loop.create_future()
+            self._load_pending[cache_key] = future
+            if not self._load_flush_scheduled:
+                self._load_flush_scheduled = True
+                loop.call_later(
+                    0.005,
+                    lambda: asyncio.ensure_future(self._flush_workflow_loads())
+                )
+        # Shield: one caller cancelling must not fail the shared batch
+        return await asyncio.shield(future)
+
+    async def _flush_workflow_loads(self):
+        """Resolve all queued workflow loads with one $or query"""
+        pending = self._load_pending
+        self._load_pending = {}
+        self._load_flush_scheduled = False
+        if not pending:
+            return
+
+        keys = list(pending)
+        try:
+            docs = await self.db.workflows.find(
+                {"$or": [{"id": wid, "user_id": uid} for wid, uid in keys]}
+            ).batch_size(len(keys)).to_list(len(keys))
+            by_key = {(d["id"], d["user_id"]): d for d in docs}
+
+            for key, future in pending.items():
+                if future.done():
+                    continue
+                doc = by_key.get(key)
+                if doc is None:
+                    future.set_result(None)
+                else:
+                    workflow = Workflow(**doc)
+                    self._workflow_cache[key] = workflow
+                    future.set_result(workflow)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
     
+    # update_workflow response fields; steps ships as ids only, enough
+    # for the count without the step bodies
+    _UPDATE_PROJECTION = {
+        "_id": 0,
+        "id": 1,
+        "name": 1,
+        "description": 1,
+        "trigger_type": 1,
+        "trigger_config": 1,
+        "status": 1,
+        "tags": 1,
+        "created_at": 1,
+        "updated_at": 1,
+        "steps.id": 1
+    }
+
     async def update_workflow(self, workflow_id: str, user_id: str, update_data: WorkflowUpdate) -> WorkflowResponse:
-        """Update workflow"""
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
+        """Update workflow
+
+        One find_one_and_update returns the updated document directly —
+        the old update-then-refetch pair cost a second round trip.
+        """
+        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
         update_dict["updated_at"] = datetime.utcnow()
-        
-        result = await self.db.workflows.update_one(
+
+        updated = await self.db.workflows.find_one_and_update(
             {"id": workflow_id, "user_id": user_id},
-            {"$set": update_dict}
+            {"$set": update_dict},
+            projection=self._UPDATE_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.matched_count == 0:
+
+        if not updated:
             raise Exception("Workflow not found")
-        
-        # Get updated workflow
-        updated_workflow = await self.get_workflow(workflow_id, user_id)
-        
-        return WorkflowResponse(
-            id=updated_workflow.id,
-            name=updated_workflow.name,
-            description=updated_workflow.description,
-            trigger_type=updated_workflow.trigger_type,
-            trigger_config=updated_workflow.trigger_config,
-            status=updated_workflow.status,
-            steps_count=len(updated_workflow.steps),
-            tags=updated_workflow.tags,
-            created_at=updated_workflow.created_at,
-            updated_at=updated_workflow.updated_at
-        )
+
+        self._invalidate(workflow_id, user_id)
+
+        # Trusted DB-sourced data; model_construct skips re-validation
+        return _workflow_response(updated, len(updated.get("steps", [])))
     
     async def add_workflow_step(self, workflow_id: str, user_id: str, step: WorkflowStep) -> WorkflowStep:
-        """Add step to workflow"""
-        # Set step order
-        workflow_doc = await self.db.workflows.find_one({"id": workflow_id, "user_id": user_id})
-        if not workflow_doc:
-            raise Exception("Workflow not found")
-        
-        workflow = Workflow(**workflow_doc)
-        step.order = len(workflow.steps)
-        
-        # Add step to workflow
-        await self.db.workflows.update_one(
+        """Add step to workflow
+
+        One atomic pipeline update computes the step's order from the
+        current array size and appends it server-side — the old
+        read-then-push pair cost an extra round trip, decoded every
+        existing step, and could race two concurrent adds into the
+        same order.
+        """
+        step_doc = step.model_dump()
+        step_doc.pop("order", None)
+        # $literal shields user-supplied config values from being parsed
+        # as aggregation expressions inside the pipeline update
+        new_step = {k: {"$literal": v} for k, v in step_doc.items()}
+        new_step["order"] = {"$size": {"$ifNull": ["$steps", []]}}
+
+        updated = await self.db.workflows.find_one_and_update(
             {"id": workflow_id, "user_id": user_id},
-            {
-                "$push": {"steps": step.dict()},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+            [{
+                "$set": {
+                    "steps": {
+                        "$concatArrays": [{"$ifNull": ["$steps", []]}, [new_step]]
+                    },
+                    "updated_at": "$$NOW"
+                }
+            }],
+            projection={"_id": 0, "steps": {"$slice": -1}},
+            return_document=ReturnDocument.AFTER
         )
-        
+        if not updated:
+            raise Exception("Workflow not found")
+
+        self._invalidate(workflow_id, user_id)
+        step.order = updated["steps"][0]["order"]
         return step
     
     async def update_workflow_step(self, workflow_id: str, user_id: str, step_id: str, step_update: Dict[str, Any]) -> bool:
@@ -133,7 +321,9 @@ class WorkflowService:
                 }
             }
         )
-        
+
+        if result.modified_count:
+            self._invalidate(workflow_id, user_id)
         return result.modified_count > 0
     
     async def remove_workflow_step(self, workflow_id: str, user_id: str, step_id: str) -> bool:
@@ -145,7 +335,9 @@ class WorkflowService:
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
-        
+
+        if result.modified_count:
+            self._invalidate(workflow_id, user_id)
         return result.modified_count > 0
     
     async def deploy_workflow(self, workflow_id: str, user_id: str) -> Dict[str, Any]:
@@ -172,7 +364,8 @@ class WorkflowService:
                     }
                 }
             )
-            
+            self._invalidate(workflow_id, user_id)
+
             # Get webhook URL if webhook trigger
             webhook_url = None
             if workflow.trigger_type == TriggerType.WEBHOOK:
@@ -194,6 +387,7 @@ class WorkflowService:
                     }
                 }
             )
+            self._invalidate(workflow_id, user_id)
             raise e
     
     async def execute_workflow(self, workflow_id: str, user_id: str, trigger_data: Dict[str, Any] = None) -> str:
@@ -213,21 +407,12 @@ class WorkflowService:
     async def get_workflow_executions(self, workflow_id: str, user_id: str, limit: int = 50) -> List[WorkflowExecutionResponse]:
         """Get workflow execution history"""
         executions = await self.db.workflow_executions.find(
-            {"workflow_id": workflow_id, "user_id": user_id}
+            {"workflow_id": workflow_id, "user_id": user_id},
+            _EXECUTION_LIST_PROJECTION
         ).sort("started_at", -1).limit(limit).to_list(limit)
         
-        return [
-            WorkflowExecutionResponse(
-                id=e["id"],
-                workflow_id=e["workflow_id"],
-                status=e["status"],
-                started_at=e["started_at"],
-                completed_at=e.get("completed_at"),
-                duration_seconds=e.get("duration_seconds"),
-                error_message=e.get("error_message")
-            )
-            for e in executions
-        ]
+        # Trusted DB-sourced data; model_construct skips re-validation
+        return [_execution_response(e) for e in executions]
     
     async def get_execution_status(self, execution_id: str, user_id: str) -> Dict[str, Any]:
         """Get execution status"""
@@ -249,7 +434,9 @@ class WorkflowService:
                 }
             }
         )
-        
+
+        if result.modified_count:
+            self._invalidate(workflow_id, user_id)
         return result.modified_count > 0
     
     async def resume_workflow(self, workflow_id: str, user_id: str) -> bool:
@@ -263,7 +450,9 @@ class WorkflowService:
                 }
             }
         )
-        
+
+        if result.modified_count:
+            self._invalidate(workflow_id, user_id)
         return result.modified_count > 0
     
     async def delete_workflow(self, workflow_id: str, user_id: str) -> bool:
@@ -271,20 +460,23 @@ class WorkflowService:
         workflow = await self.get_workflow(workflow_id, user_id)
         if not workflow:
             return False
-        
-        # Delete from n8n if deployed
+
+        # The n8n delete and the two Mongo deletes are independent; run
+        # them together so the call takes the slowest leg, not the sum.
+        # return_exceptions keeps the n8n delete non-fatal, as before.
+        ops = [
+            self.db.workflows.delete_one({"id": workflow_id, "user_id": user_id}),
+            self.db.workflow_executions.delete_many({"workflow_id": workflow_id})
+        ]
         if workflow.n8n_workflow_id:
-            try:
-                await n8n_service.delete_n8n_workflow(workflow.n8n_workflow_id)
-            except Exception:
-                pass  # Continue even if n8n deletion fails
-        
-        # Delete executions
-        await self.db.workflow_executions.delete_many({"workflow_id": workflow_id})
-        
-        # Delete workflow
-        result = await self.db.workflows.delete_one({"id": workflow_id, "user_id": user_id})
-        
-        return result.deleted_count > 0
+            ops.append(n8n_service.delete_n8n_workflow(workflow.n8n_workflow_id))
+
+        results = await asyncio.gather(*ops, return_exceptions=True)
+
+        self._invalidate(workflow_id, user_id)
+        delete_result = results[0]
+        if isinstance(delete_result, BaseException):
+            raise delete_result
+        return delete_result.deleted_count > 0
 
 workflow_service = WorkflowService()
\ No newline at end of file
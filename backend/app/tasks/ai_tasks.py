@@ -4,51 +4,66 @@ import asyncio
 
 from app.services.ai_service import ai_service
 from app.db.mongodb import get_database
+from app.tasks.runner import run_async
 
-@celery_app.task(bind=True)
-def process_ai_message_task(self, user_id: str, conversation_id: str, message_content: str, thinking_mode: str = "medium"):
+# Retries are declared on the decorator: Celery applies exponential
+# backoff with jitter itself, so the task bodies carry no retry
+# bookkeeping and shrink to the one coroutine submission
+@celery_app.task(
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=3
+)
+def process_ai_message_task(user_id: str, conversation_id: str, message_content: str, thinking_mode: str = "medium"):
     """Background task for AI message processing"""
-    try:
-        # Run async function in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
-            ai_service.process_message(user_id, conversation_id, message_content, thinking_mode)
-        )
-        
-        loop.close()
-        return result
-    
-    except Exception as e:
-        # Retry up to 3 times with exponential backoff
-        if self.request.retries < 3:
-            raise self.retry(countdown=60 * (2 ** self.request.retries), max_retries=3)
-        raise e
+    return run_async(
+        ai_service.process_message(user_id, conversation_id, message_content, thinking_mode)
+    )
+
+@celery_app.task(
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=3
+)
+def submit_ai_batch_task(requests: list):
+    """Submit non-interactive AI requests through the provider batch API"""
+    return run_async(ai_service.process_message_batch(requests))
+
+@celery_app.task
+def poll_ai_batches_task():
+    """Collect finished provider batches and persist their messages"""
+    return run_async(ai_service.poll_batches())
 
 @celery_app.task
 def batch_ai_processing_task(requests: list):
-    """Process multiple AI requests in batch"""
-    results = []
-    
-    for request in requests:
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            result = loop.run_until_complete(
+    """Process multiple AI requests in batch
+
+    The requests are independent, so they fan out concurrently and the
+    batch takes one slowest-call's wall time instead of the sum. For
+    latency-insensitive work, submit_ai_batch_task routes through the
+    provider's true batch API instead.
+    """
+    async def _process_all():
+        return await asyncio.gather(
+            *(
                 ai_service.process_message(
                     request["user_id"],
                     request["conversation_id"],
                     request["message_content"],
                     request.get("thinking_mode", "medium")
                 )
-            )
-            
-            results.append({"success": True, "result": result})
-            loop.close()
-            
-        except Exception as e:
-            results.append({"success": False, "error": str(e)})
-    
-    return results
\ No newline at end of file
+                for request in requests
+            ),
+            return_exceptions=True
+        )
+
+    return [
+        {"success": False, "error": str(result)}
+        if isinstance(result, Exception)
+        else {"success": True, "result": result}
+        for result in run_async(_process_all())
+    ]
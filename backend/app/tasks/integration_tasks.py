@@ -1,54 +1,47 @@
 from celery import current_app as celery_app
 import asyncio
+from datetime import datetime
 from typing import Dict, Any
 
 from app.services.integration_service import integration_service
 from app.db.mongodb import get_database
+from app.tasks.runner import run_async
 
-@celery_app.task(bind=True)
-def sync_integration_data_task(self, user_id: str, integration_id: str):
+# Retry handling lives on the decorator; 5-minute delay as before
+@celery_app.task(autoretry_for=(Exception,), default_retry_delay=300, max_retries=3)
+def sync_integration_data_task(user_id: str, integration_id: str):
     """Background task for syncing integration data"""
-    try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+    async def _sync():
         # Get integration details
         db = get_database()
-        integration_doc = loop.run_until_complete(
-            db.integrations.find_one({"id": integration_id, "user_id": user_id})
+        integration_doc = await db.integrations.find_one(
+            {"id": integration_id, "user_id": user_id}
         )
-        
+
         if not integration_doc:
             raise Exception("Integration not found")
-        
+
         integration_type = integration_doc["integration_type"]
-        
+
         # Perform sync based on integration type
         if integration_type == "slack":
-            result = loop.run_until_complete(sync_slack_data(user_id, integration_id))
+            result = await sync_slack_data(user_id, integration_id)
         elif integration_type == "google":
-            result = loop.run_until_complete(sync_google_data(user_id, integration_id))
+            result = await sync_google_data(user_id, integration_id)
         elif integration_type == "github":
-            result = loop.run_until_complete(sync_github_data(user_id, integration_id))
+            result = await sync_github_data(user_id, integration_id)
         else:
             result = {"status": "no_sync_needed"}
-        
+
         # Update last sync time
-        loop.run_until_complete(
-            db.integrations.update_one(
-                {"id": integration_id},
-                {"$set": {"last_sync": __import__('datetime').datetime.utcnow()}}
-            )
+        await db.integrations.update_one(
+            {"id": integration_id},
+            {"$set": {"last_sync": datetime.utcnow()}}
         )
-        
-        loop.close()
+
         return result
-    
-    except Exception as e:
-        # Retry up to 3 times
-        if self.request.retries < 3:
-            raise self.retry(countdown=300, max_retries=3)  # 5 minutes
-        raise e
+
+    return run_async(_sync())
 
 async def sync_slack_data(user_id: str, integration_id: str) -> Dict[str, Any]:
     """Sync Slack channels, users, and recent messages"""
@@ -70,15 +63,9 @@ async def sync_github_data(user_id: str, integration_id: str) -> Dict[str, Any]:
 def execute_integration_action_task(user_id: str, integration_type: str, action: str, parameters: Dict[str, Any]):
     """Execute integration action in background"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(
+        return run_async(
             integration_service.execute_action(user_id, integration_type, action, parameters)
         )
-        
-        loop.close()
-        return result
-    
+
     except Exception as e:
-        raise e
\ No newline at end of file
+        raise e
@@ -0,0 +1,40 @@
+"""Persistent event loop shared by all Celery tasks in a worker process.
+
+Tasks run in sync worker processes but call into the async service layer.
+The old per-task pattern — new_event_loop / run_until_complete / close —
+threw away the Motor, Redis and httpx connection pools on every task, so
+each invocation re-paid TCP+TLS handshakes and pool warm-up. One daemon
+thread per worker process runs a single loop forever; tasks submit their
+coroutine to it and block on the result, and every client created on that
+loop keeps its pool across tasks.
+"""
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+from celery.signals import worker_process_init
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name="celery-async-loop",
+                daemon=True
+            ).start()
+            _loop = loop
+    return _loop
+
+def run_async(coro: Coroutine) -> Any:
+    """Run a coroutine on the worker's persistent loop and wait for it"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+@worker_process_init.connect
+def _init_worker_loop(**_kwargs):
+    """Spin the loop up at fork time instead of on the first task"""
+    _get_loop()
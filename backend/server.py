@@ -1,7 +1,9 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import orjson
 import os
 import logging
 from pathlib import Path
@@ -14,35 +16,76 @@ from datetime import datetime
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, tuned like the main app's client (app/db/mongodb.py):
+# wire compression cuts bytes-on-wire for the document-heavy endpoints, and
+# minPoolSize == a healthy floor keeps warm sockets through idle periods so
+# bursts don't stall on handshakes. Both fall back to uncompressed / driver
+# behavior when the server doesn't support them.
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=int(os.environ.get('MONGO_MAX_POOL', 100)),
+    minPoolSize=int(os.environ.get('MONGO_MIN_POOL', 20)),
+    compressors="zstd,snappy",
+    serverSelectionTimeoutMS=3000,
+    retryWrites=True
+)
 db = client[os.environ.get('DB_NAME', 'test_database')]
 
 # Create the main app
+# orjson encodes responses in C and handles datetime/UUID natively —
+# same default as the main app in app/main.py
 app = FastAPI(
     title="Loki AI Platform Backend",
     version="1.0.0",
-    description="AI-Powered Productivity Platform Backend"
+    description="AI-Powered Productivity Platform Backend",
+    default_response_class=ORJSONResponse
 )
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Constant payloads, encoded once at import: these endpoints rebuilt and
+# re-serialized the same dict on every hit, and load balancers poll some
+# of them continuously
+_ROOT_BYTES = orjson.dumps({
+    "message": "Loki AI Platform Backend",
+    "version": "1.0.0",
+    "status": "healthy"
+})
+
+_API_ROOT_BYTES = orjson.dumps({
+    "message": "Loki AI Platform API",
+    "version": "1.0.0"
+})
+
+_INTEGRATIONS_BYTES = orjson.dumps({
+    "integrations": [
+        {"name": "Slack", "type": "slack", "status": "available"},
+        {"name": "Google Workspace", "type": "google", "status": "available"},
+        {"name": "GitHub", "type": "github", "status": "available"},
+        {"name": "Notion", "type": "notion", "status": "available"},
+        {"name": "Figma", "type": "figma", "status": "available"},
+        {"name": "Jira", "type": "jira", "status": "available"}
+    ]
+})
+
+_WORKFLOWS_BYTES = orjson.dumps({
+    "workflows": [],
+    "message": "Workflow system ready"
+})
+
 # Basic health check endpoints
 @app.get("/")
 async def root():
-    return {
-        "message": "Loki AI Platform Backend",
-        "version": "1.0.0",
-        "status": "healthy"
-    }
+    return Response(_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
+        # orjson serializes datetimes directly; no isoformat() needed
+        "timestamp": datetime.utcnow()
     }
 
 # Define Models (keeping the original status check for compatibility)
@@ -57,7 +100,7 @@ class StatusCheckCreate(BaseModel):
 # Basic API endpoints for compatibility
 @api_router.get("/")
 async def api_root():
-    return {"message": "Loki AI Platform API", "version": "1.0.0"}
+    return Response(_API_ROOT_BYTES, media_type="application/json")
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
@@ -66,30 +109,29 @@ async def create_status_check(input: StatusCheckCreate):
     await db.status_checks.insert_one(status_obj.dict())
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
+@api_router.get("/status")
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    # Stream NDJSON instead of materializing 1000 documents and models:
+    # BSON decode interleaves with the client send and peak memory stays
+    # one batch deep. No response_model — it would force full
+    # materialization again.
+    async def stream():
+        cursor = db.status_checks.find({}, {"_id": 0}).batch_size(200)
+        async for doc in cursor:
+            yield orjson.dumps(doc) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 # Placeholder API endpoints for the full platform
 @api_router.get("/integrations")
 async def get_integrations():
     """Get available integrations"""
-    return {
-        "integrations": [
-            {"name": "Slack", "type": "slack", "status": "available"},
-            {"name": "Google Workspace", "type": "google", "status": "available"},
-            {"name": "GitHub", "type": "github", "status": "available"},
-            {"name": "Notion", "type": "notion", "status": "available"},
-            {"name": "Figma", "type": "figma", "status": "available"},
-            {"name": "Jira", "type": "jira", "status": "available"}
-        ]
-    }
+    return Response(_INTEGRATIONS_BYTES, media_type="application/json")
 
 @api_router.get("/workflows")
 async def get_workflows():
     """Get workflows"""
-    return {"workflows": [], "message": "Workflow system ready"}
+    return Response(_WORKFLOWS_BYTES, media_type="application/json")
 
 @api_router.post("/chat")
 async def chat_endpoint(message: Dict[str, Any]):